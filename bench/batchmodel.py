@@ -0,0 +1,178 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Benchmark batched intra-experiment model evaluation against experiment count.
+
+Compares running the sample JSONSIM ``NoisyModel`` once per experiment, as
+SIERRA did before, against running it through
+:class:`plugins.batchmodel.BatchIntraExpModel1D`, where the first call computes
+all experiments at once. Also times the process-pool fallback for a model which
+only implements ``run_exp()``, with 1 vs. ``--workers`` workers.
+
+Usage::
+
+    python3 bench/batchmodel.py [--exps 10 100 ...] [--reps N] [--workers N]
+"""
+
+# Core packages
+import argparse
+import pathlib
+import sys
+import timeit
+
+# 3rd party packages
+import numpy as np
+import polars as pl
+
+# Project packages
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+from plugins import batchmodel  # noqa: E402
+from projects.sample_jsonsim.models import noise  # noqa: E402
+
+
+_SETUP = {}
+
+
+class _Criteria:
+    def __init__(self, n_exp: int) -> None:
+        self.names = [f"c1-exp{i}" for i in range(0, n_exp)]
+
+    def gen_exp_names(self) -> list[str]:
+        return self.names
+
+
+class _PathSet:
+    def __init__(self, exp_name: str) -> None:
+        root = pathlib.Path("/tmp/bench")
+        self.input_root = root / "exp-inputs" / exp_name
+        self.output_root = root / "exp-outputs" / exp_name
+        self.graph_root = root / "graphs" / exp_name
+        self.model_root = root / "models" / exp_name
+        self.stat_root = root / "statistics" / exp_name
+
+
+class _LoopNoisyModel:
+    """What NoisyModel was before batching: one draw/frame per experiment."""
+
+    def run(self, criteria, exp_num, cmdopts, pathset) -> list[pl.DataFrame]:
+        data = np.random.normal(loc=0, scale=1, size=(50, 1)) * 80
+        return [pl.DataFrame(data, schema=["model"])]
+
+
+class _SlowModel(batchmodel.BatchIntraExpModel1D):
+    """A model which can't be vectorized: some CPU-bound work per experiment."""
+
+    def run_exp(self, criteria, exp_num, cmdopts, pathset) -> list[pl.DataFrame]:
+        rng = np.random.default_rng(exp_num)
+        data = rng.normal(size=(200, 200))
+        for _ in range(0, 5):
+            data = np.tanh(data @ data.T / 200)
+
+        return [pl.DataFrame(data[:50, :1], schema=["model"])]
+
+    def should_run(self, criteria, cmdopts, exp_num: int) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return "Slow Model"
+
+
+def _run_all(model, n_exp: int) -> list[list[pl.DataFrame]]:
+    # SIERRA creates the paths for each experiment regardless of the model, so
+    # that isn't timed.
+    criteria, pathsets = _SETUP[n_exp]
+    cmdopts = {"exp_range": None}
+    return [
+        model.run(criteria, i, cmdopts, pathsets[i]) for i in range(0, n_exp)
+    ]
+
+
+def _setup(n_exp: int) -> None:
+    criteria = _Criteria(n_exp)
+    _SETUP[n_exp] = (criteria, [_PathSet(name) for name in criteria.names])
+
+
+def _check(n_exp: int) -> None:
+    for dfs in _run_all(noise.NoisyModel({}), n_exp):
+        assert len(dfs) == 1
+        assert dfs[0].columns == ["model"] and dfs[0].shape == (50, 1)
+
+    serial = _run_all(_SlowModel({"workers": 1}), n_exp)
+    pooled = _run_all(_SlowModel({"workers": 2}), n_exp)
+    for s, p in zip(serial, pooled):
+        assert s[0].equals(p[0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--exps",
+        nargs="+",
+        type=int,
+        default=[10, 100, 1000, 10000],
+        help="Experiment counts to benchmark.",
+    )
+    parser.add_argument("--reps", type=int, default=5, help="Repetitions per size.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Workers for the process-pool fallback (0=all cores).",
+    )
+    args = parser.parse_args()
+
+    for n_exp in set(args.exps + [8]):
+        _setup(n_exp)
+
+    _check(8)
+
+    print("Vectorized: NoisyModel")
+    print(f"{'exps':>8} {'loop (s)':>10} {'batch (s)':>10} {'speedup':>8}")
+    for n_exp in args.exps:
+        t_loop = min(
+            timeit.repeat(
+                lambda: _run_all(_LoopNoisyModel(), n_exp),
+                number=1,
+                repeat=args.reps,
+            )
+        )
+        t_batch = min(
+            timeit.repeat(
+                lambda: _run_all(noise.NoisyModel({}), n_exp),
+                number=1,
+                repeat=args.reps,
+            )
+        )
+        print(
+            f"{n_exp:>8} {t_loop:>10.4f} {t_batch:>10.4f} "
+            f"{t_loop / t_batch:>7.1f}x"
+        )
+
+    print(f"\nProcess pool: run_exp() only, workers={args.workers or 'all'}")
+    print(f"{'exps':>8} {'serial (s)':>10} {'pool (s)':>10} {'speedup':>8}")
+    for n_exp in [n for n in args.exps if n <= 1000]:
+        t_serial = min(
+            timeit.repeat(
+                lambda: _run_all(_SlowModel({"workers": 1}), n_exp),
+                number=1,
+                repeat=1,
+            )
+        )
+        t_pool = min(
+            timeit.repeat(
+                lambda: _run_all(_SlowModel({"workers": args.workers}), n_exp),
+                number=1,
+                repeat=1,
+            )
+        )
+        print(
+            f"{n_exp:>8} {t_serial:>10.4f} {t_pool:>10.4f} "
+            f"{t_serial / t_pool:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Check how much import time each sample plugin/project module adds to SIERRA.
+
+Each module is imported with ``python3 -X importtime`` in a fresh interpreter
+which has already imported what every SIERRA invocation imports before
+loading plugins (``--baseline-modules``), so only the cost the module itself
+adds is counted: its own code, plus anything it imports which SIERRA doesn't.
+The best of ``--reps`` is taken, since import times are noisy.
+
+Any module over ``--budget-ms`` is flagged, along with the (new) top-level
+packages it pulled in, and the exit code is non-zero, so this can be used as a
+regression test.
+
+Usage::
+
+    python3 bench/importtime.py [--budget-ms 25] [--reps 3] [MODULE ...]
+"""
+
+# Core packages
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+
+# 3rd party packages
+
+# Project packages
+
+_kREPO = pathlib.Path(__file__).resolve().parent.parent
+
+# What SIERRA core has imported by the time it loads the engine/project plugins.
+# Other plugins (e.g., execenv.hpc) are left out, as they may not be loaded.
+_kBASELINE = [
+    "implements",
+    "numpy",
+    "polars",
+    "sierra.core.cmdline",
+    "sierra.core.plugin",
+    "sierra.core.experiment.bindings",
+    "sierra.core.experiment.spec",
+    "sierra.core.models.interface",
+    "sierra.core.variables.batch_criteria",
+]
+
+_kMODULES = [
+    "plugins.jsonsim.plugin2",
+    "plugins.jsonsim.cmdline",
+    "plugins.jsonsim.generators.engine",
+    "plugins.yamlsim.plugin2",
+    "plugins.yamlsim.cmdline",
+    "plugins.yamlsim.generators.engine",
+    "projects.sample_jsonsim.cmdline",
+    "projects.sample_jsonsim.generators.scenario",
+    "projects.sample_jsonsim.generators.experiment",
+    "projects.sample_jsonsim.variables.fuel",
+    "projects.sample_jsonsim.variables.max_speed",
+    "projects.sample_jsonsim.models.noise",
+    "projects.sample_yamlsim.cmdline",
+    "projects.sample_yamlsim.generators.scenario",
+    "projects.sample_yamlsim.generators.experiment",
+    "projects.sample_yamlsim.variables.noise_floor",
+    "projects.sample_yamlsim.variables.tolerance",
+]
+
+
+def _importtime(module: str, baseline: list[str]) -> tuple[float, list[str]]:
+    """
+    Get the cumulative import time (ms) of a module on top of the baseline.
+
+    Also returns the new top-level packages it imported.
+    """
+    pythonpath = [str(_kREPO)]
+    if "PYTHONPATH" in os.environ:
+        pythonpath.append(os.environ["PYTHONPATH"])
+
+    code = "; ".join(f"import {m}" for m in baseline)
+    code += f"; import sys; sys.stderr.write('--mark--\\n'); import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(pythonpath)),
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+
+    lines = proc.stderr.split("--mark--\n", 1)[1].splitlines()
+    total_us = 0
+    packages = set()
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+
+        self_us, _, name = line[len("import time:") :].split("|")
+        total_us += int(self_us)
+        packages.add(name.strip().split(".")[0])
+
+    return total_us / 1000, sorted(packages - {"plugins", "projects"})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "modules", nargs="*", default=_kMODULES, help="Modules to check."
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=25.0,
+        help="Max import time a module may add.",
+    )
+    parser.add_argument("--reps", type=int, default=3, help="Repetitions per module.")
+    parser.add_argument(
+        "--baseline-modules",
+        nargs="+",
+        default=_kBASELINE,
+        help="Modules imported before each module is checked.",
+    )
+    args = parser.parse_args()
+
+    n_over = 0
+    print(f"{'ms':>8}  module")
+    for module in args.modules:
+        runs = [_importtime(module, args.baseline_modules) for _ in range(args.reps)]
+        ms, packages = min(runs)
+
+        over = ms > args.budget_ms
+        n_over += over
+        print(f"{ms:>8.1f}  {module}{'  OVER BUDGET' if over else ''}")
+        if over and packages:
+            print(f"{'':>8}  new packages: {', '.join(packages)}")
+
+    return 1 if n_over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
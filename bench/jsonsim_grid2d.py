@@ -0,0 +1,123 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Benchmark JSONSIM 2D output generation against grid size.
+
+Compares the original per-cell loop against the vectorized generator used by
+the simulator, and times a full JSONSIM run at each grid size. Also checks that
+both generators produce identical data for the same seed.
+
+Usage::
+
+    python3 bench/jsonsim_grid2d.py [--sizes 8x6 64x48 ...] [--reps N]
+"""
+
+# Core packages
+import argparse
+import importlib.util
+import pathlib
+import tempfile
+import timeit
+
+# 3rd party packages
+import numpy as np
+import pandas as pd
+
+# Project packages
+
+_kJSONSIM = pathlib.Path(__file__).parent.parent / "plugins" / "jsonsim" / "jsonsim.py"
+
+
+def _load_jsonsim():
+    spec = importlib.util.spec_from_file_location("jsonsim", _kJSONSIM)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _loop_output2D(rng: np.random.Generator, n_x: int, n_y: int) -> pd.DataFrame:
+    data2D = []
+    for i in range(0, n_x):
+        for j in range(0, n_y):
+            data2D.append({"x": i, "y": j, "z": rng.random()})
+
+    return pd.DataFrame(data2D)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=["8x6", "64x48", "256x192", "1024x768"],
+        help="Grid sizes to benchmark, as <X>x<Y>.",
+    )
+    parser.add_argument("--reps", type=int, default=5, help="Repetitions per size.")
+    args = parser.parse_args()
+
+    jsonsim = _load_jsonsim()
+
+    print(
+        f"{'grid':>10} {'cells':>9} {'loop (s)':>10} {'vec (s)':>10} "
+        f"{'speedup':>8} {'run (s)':>10}"
+    )
+
+    for size in args.sizes:
+        n_x, n_y = map(int, size.split("x"))
+
+        # The loop is the slow path; don't wait forever on big grids.
+        loop_reps = args.reps if n_x * n_y <= 100000 else 1
+
+        expected = _loop_output2D(np.random.default_rng(42), n_x, n_y)
+        actual = jsonsim.gen_output2D(np.random.default_rng(42), n_x, n_y)
+        pd.testing.assert_frame_equal(expected, actual)
+
+        t_loop = min(
+            timeit.repeat(
+                lambda: _loop_output2D(np.random.default_rng(42), n_x, n_y),
+                number=1,
+                repeat=loop_reps,
+            )
+        )
+        t_vec = min(
+            timeit.repeat(
+                lambda: jsonsim.gen_output2D(np.random.default_rng(42), n_x, n_y),
+                number=1,
+                repeat=args.reps,
+            )
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = {
+                "exp_setup": {
+                    "length": 10,
+                    "n_datapoints": 50,
+                    "grid_x": n_x,
+                    "grid_y": n_y,
+                    "chunk_size": 0,
+                },
+                "output_root": tmpdir,
+                "random_seed": 42,
+                "output_mode": "copy",
+                "output_format": "csv",
+                "output_summary": False,
+            }
+            t_run = min(
+                timeit.repeat(
+                    lambda: jsonsim.run(config, "gaussian"),
+                    number=1,
+                    repeat=args.reps,
+                )
+            )
+
+        print(
+            f"{size:>10} {n_x * n_y:>9} {t_loop:>10.4f} {t_vec:>10.4f} "
+            f"{t_loop / t_vec:>7.1f}x {t_run:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Benchmark each SIERRA pipeline stage on synthetic batches from the sample projects.
+
+For each engine, a batch of ``--exps`` experiments (via the ``fuel`` criteria
+for JSONSIM and ``noise_floor`` for YAMLSIM) of ``--runs`` runs each is
+generated, run, processed, etc., with each of ``--stages`` run as a separate
+``sierra-cli`` invocation. JSONSIM runs generate ``--datapoints`` datapoints
+(via ``--exp-setup``); YAMLSIM outputs are a fixed size. For each stage, the
+wall time, CPU time (of the whole process tree) and peak RSS are recorded, and
+written as JSON to ``--out``. Peak RSS is that of the largest single process
+in the tree (e.g., one run, or SIERRA itself), not of the tree as a whole: with
+parallel runs, the stage's total memory use is higher.
+
+With ``--baseline``, results are compared against a previous ``--out``, and
+any stage which got slower or bigger by more than ``--tolerance`` (and by more
+than 0.5s/16 MiB, to ignore noise), or which failed when it didn't before, is
+flagged; the exit code is then non-zero, so this can gate upgrades. Only
+compare results from the same machine and arguments.
+
+Everything runs locally (``--execenv=hpc.local``), so GNU parallel must be on
+``PATH``; stage 4 needs LaTeX for graph labels. A failed stage is recorded as
+such (see ``<root>/<engine>-stage<N>.log``), and the remaining stages for that
+engine are skipped.
+
+Usage::
+
+    python3 bench/pipeline.py [--engines jsonsim yamlsim] [--exps N] [--runs M]
+                              [--datapoints K] [--stages 1 2 3 4 5]
+                              [--collate proc.collate|plugins.collate]
+                              [--out results.json] [--baseline baseline.json]
+"""
+
+# Core packages
+import argparse
+import json
+import os
+import pathlib
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# 3rd party packages
+
+# Project packages
+
+_kREPO = pathlib.Path(__file__).resolve().parent.parent
+
+_kENGINES = {
+    "jsonsim": [
+        "--engine=plugins.jsonsim",
+        "--project=projects.sample_jsonsim",
+        f"--expdef-template={_kREPO / 'exp' / 'jsonsim' / 'template.json'}",
+        "--expdef=expdef.json",
+        f"--jsonsim-path={_kREPO / 'plugins' / 'jsonsim' / 'jsonsim.py'}",
+    ],
+    "yamlsim": [
+        "--engine=plugins.yamlsim",
+        "--project=projects.sample_yamlsim",
+        f"--expdef-template={_kREPO / 'exp' / 'yamlsim' / 'template.yaml'}",
+        "--expdef=expdef.yaml",
+        f"--yamlsim-path={_kREPO / 'plugins' / 'yamlsim' / 'yamlsim.py'}",
+    ],
+}
+
+_kCRITERIA = {"jsonsim": "fuel", "yamlsim": "noise_floor"}
+
+_kCONTROLLER = "default.default"
+
+# Changes smaller than these are noise, whatever --tolerance says.
+_kMIN_DELTA = {"wall_s": 0.5, "peak_rss_mib": 16.0}
+
+_kSTAGE_ARGS = {
+    1: [],
+    2: [],
+    3: ["--proc", "proc.statistics"],
+    4: [],
+    5: ["--things", _kCONTROLLER, "--across", "controllers", "--bc-cardinality", "1"],
+}
+
+
+def _cmd(args: argparse.Namespace, engine: str, root: pathlib.Path, stage: int):
+    cmd = [
+        args.sierra_cli,
+        "--skip-pkg-checks",
+        f"--sierra-root={root}",
+        "--execenv=hpc.local",
+        f"--controller={_kCONTROLLER}",
+        "--scenario=scenario1",
+        f"--n-runs={args.runs}",
+        "--batch-criteria",
+        f"{_kCRITERIA[engine]}.1.9.C{args.exps}",
+        "--pipeline",
+        str(stage),
+        *_kENGINES[engine],
+        *_kSTAGE_ARGS[stage],
+    ]
+    if stage == 3:
+        cmd.append(args.collate)
+    if engine == "jsonsim":
+        cmd.append(f"--exp-setup=exp_setup.T10.K5.N{args.datapoints}")
+
+    return cmd
+
+
+def _run_stage(
+    args: argparse.Namespace, engine: str, root: pathlib.Path, stage: int
+) -> dict:
+    pythonpath = [str(_kREPO)]
+    if "PYTHONPATH" in os.environ:
+        pythonpath.append(os.environ["PYTHONPATH"])
+
+    env = dict(
+        os.environ,
+        SIERRA_PLUGIN_PATH=f"{_kREPO / 'projects'}:{_kREPO / 'plugins'}",
+        PYTHONPATH=os.pathsep.join(pythonpath),
+    )
+    log = root / f"{engine}-stage{stage}.log"
+
+    with open(log, "w") as f:
+        start = time.monotonic()
+        proc = subprocess.Popen(
+            _cmd(args, engine, root, stage), stdout=f, stderr=subprocess.STDOUT, env=env
+        )
+        # On Linux, the usage wait4() reports includes all the descendants the
+        # child waited for, i.e., the whole stage: CPU times are summed over
+        # them, but ru_maxrss is the largest peak RSS of any single one.
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.monotonic() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+    return {
+        "engine": engine,
+        "stage": stage,
+        "returncode": proc.returncode,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mib": round(usage.ru_maxrss / 1024, 1),
+    }
+
+
+def _bench(args: argparse.Namespace, root: pathlib.Path) -> list[dict]:
+    results = []
+    for engine in args.engines:
+        for stage in args.stages:
+            result = _run_stage(args, engine, root, stage)
+            results.append(result)
+            _print_result(result)
+
+            if result["returncode"] != 0:
+                print(
+                    f"{engine} stage {stage} failed; see "
+                    f"{root / f'{engine}-stage{stage}.log'}. Skipping later stages",
+                    file=sys.stderr,
+                )
+                break
+
+    return results
+
+
+def _print_result(result: dict) -> None:
+    status = "ok" if result["returncode"] == 0 else f"FAILED({result['returncode']})"
+    print(
+        f"{result['engine']:>8} {result['stage']:>5} {result['wall_s']:>10.2f} "
+        f"{result['cpu_s']:>10.2f} {result['peak_rss_mib']:>10.1f} {status:>10}"
+    )
+
+
+def _compare(results: list[dict], baseline: dict, tolerance: float) -> int:
+    """
+    Compare results against a baseline; returns the # of regressions.
+    """
+    base = {(r["engine"], r["stage"]): r for r in baseline["results"]}
+    n_regressions = 0
+
+    print(
+        f"\nvs. baseline from {baseline['meta']['timestamp']} "
+        f"(tolerance {tolerance:.0%}):"
+    )
+    print(f"{'engine':>8} {'stage':>5} {'wall':>16} {'peak RSS':>16}  status")
+
+    for r in results:
+        b = base.get((r["engine"], r["stage"]))
+        if b is None:
+            continue
+
+        flags = []
+        if r["returncode"] != 0 and b["returncode"] == 0:
+            flags.append("now fails")
+        elif r["returncode"] == 0 and b["returncode"] == 0:
+            for key, what in [("wall_s", "slower"), ("peak_rss_mib", "bigger")]:
+                if (
+                    r[key] > b[key] * (1 + tolerance)
+                    and r[key] - b[key] > _kMIN_DELTA[key]
+                ):
+                    flags.append(f"{r[key] / b[key]:.2f}x {what}")
+
+        n_regressions += 1 if flags else 0
+        print(
+            f"{r['engine']:>8} {r['stage']:>5} "
+            f"{b['wall_s']:>7.2f}->{r['wall_s']:<7.2f} "
+            f"{b['peak_rss_mib']:>7.1f}->{r['peak_rss_mib']:<7.1f}  "
+            f"{'REGRESSION: ' + ', '.join(flags) if flags else 'ok'}"
+        )
+
+    return n_regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(_kENGINES),
+        default=list(_kENGINES),
+        help="Sample engines/projects to benchmark.",
+    )
+    parser.add_argument("--exps", type=int, default=10, help="Experiments per batch.")
+    parser.add_argument("--runs", type=int, default=4, help="Runs per experiment.")
+    parser.add_argument(
+        "--datapoints", type=int, default=1000, help="Datapoints per JSONSIM run."
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        type=int,
+        choices=[1, 2, 3, 4, 5],
+        default=[1, 2, 3, 4, 5],
+        help="Pipeline stages to time, in order.",
+    )
+    parser.add_argument(
+        "--collate",
+        choices=["proc.collate", "plugins.collate"],
+        default="proc.collate",
+        help="Collation plugin to use in stage 3.",
+    )
+    parser.add_argument(
+        "--root",
+        help="--sierra-root to use; a temporary directory (removed after) if omitted.",
+    )
+    parser.add_argument("--out", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare results to this JSON file.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown/growth vs. --baseline to flag as a regression.",
+    )
+    parser.add_argument(
+        "--sierra-cli",
+        default=shutil.which("sierra-cli"),
+        help="Path to sierra-cli (default: from PATH).",
+    )
+    args = parser.parse_args()
+
+    if args.sierra_cli is None:
+        parser.error("sierra-cli not found on PATH; use --sierra-cli")
+
+    print(
+        f"{'engine':>8} {'stage':>5} {'wall (s)':>10} {'cpu (s)':>10} "
+        f"{'rss (MiB)':>10} {'status':>10}"
+    )
+
+    if args.root:
+        root = pathlib.Path(args.root).resolve()
+        shutil.rmtree(root, ignore_errors=True)
+        root.mkdir(parents=True)
+        results = _bench(args, root)
+    else:
+        with tempfile.TemporaryDirectory(prefix="sierra-bench-") as tmp:
+            results = _bench(args, pathlib.Path(tmp))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "n_cpus": os.cpu_count(),
+            "args": {
+                k: v for k, v in vars(args).items() if k not in ["out", "baseline"]
+            },
+        },
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+        if _compare(results, baseline, args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
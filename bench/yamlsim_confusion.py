@@ -0,0 +1,133 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Benchmark YAMLSIM confusion matrix generation against class count.
+
+Compares the original per-occurrence dict loop against the vectorized
+generator used by the simulator. Also checks that, given the same per-cell
+counts, both produce identical data.
+
+Usage::
+
+    python3 bench/yamlsim_confusion.py [--classes 10 100 ...] [--reps N]
+"""
+
+# Core packages
+import argparse
+import importlib.util
+import pathlib
+import timeit
+
+# 3rd party packages
+import numpy as np
+import pandas as pd
+
+# Project packages
+
+_kYAMLSIM = pathlib.Path(__file__).parent.parent / "plugins" / "yamlsim" / "yamlsim.py"
+
+
+def _load_yamlsim():
+    spec = importlib.util.spec_from_file_location("yamlsim", _kYAMLSIM)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _loop_confusion_matrix(rng: np.random.Generator, n_classes: int) -> pd.DataFrame:
+    classes = [f"Class_{i}" for i in range(0, n_classes)]
+
+    confusion_data = []
+    for actual_class in classes:
+        for predicted_class in classes:
+            if actual_class == predicted_class:
+                count = rng.integers(70, 95)
+            else:
+                count = rng.integers(1, 10)
+
+            for _ in range(count):
+                confusion_data.append(
+                    {"Actual_Class": actual_class, "Predicted_Class": predicted_class}
+                )
+
+    confusion_df = pd.DataFrame(confusion_data)
+    confusion_df["Index"] = range(len(confusion_df))
+    return confusion_df[["Index", "Actual_Class", "Predicted_Class"]]
+
+
+def _check(yamlsim, n_classes: int) -> None:
+    # The two draw the per-cell counts in a different order, so feed the
+    # counts the loop drew into the vectorized expansion via a stub RNG.
+    expected = _loop_confusion_matrix(np.random.default_rng(42), n_classes)
+
+    counts = (
+        expected.groupby(["Actual_Class", "Predicted_Class"], sort=False)
+        .size()
+        .to_numpy()
+        .reshape(n_classes, n_classes)
+    )
+
+    class _Counts:
+        def integers(self, low, high, size):
+            return counts.copy() if isinstance(size, tuple) else np.diag(counts)
+
+    actual = yamlsim.gen_confusion_matrix(_Counts(), n_classes)
+    pd.testing.assert_frame_equal(
+        expected, actual, check_dtype=False, check_categorical=False
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--classes",
+        nargs="+",
+        type=int,
+        default=[10, 50, 100, 300],
+        help="Class counts to benchmark.",
+    )
+    parser.add_argument("--reps", type=int, default=5, help="Repetitions per size.")
+    args = parser.parse_args()
+
+    yamlsim = _load_yamlsim()
+
+    print(
+        f"{'classes':>8} {'rows':>10} {'loop (s)':>10} {'vec (s)':>10} "
+        f"{'speedup':>8}"
+    )
+
+    for n_classes in args.classes:
+        _check(yamlsim, n_classes)
+
+        # The loop is the slow path; don't wait forever on many classes.
+        loop_reps = args.reps if n_classes <= 100 else 1
+
+        t_loop = min(
+            timeit.repeat(
+                lambda: _loop_confusion_matrix(np.random.default_rng(42), n_classes),
+                number=1,
+                repeat=loop_reps,
+            )
+        )
+        t_vec = min(
+            timeit.repeat(
+                lambda: yamlsim.gen_confusion_matrix(
+                    np.random.default_rng(42), n_classes
+                ),
+                number=1,
+                repeat=args.reps,
+            )
+        )
+        n_rows = len(yamlsim.gen_confusion_matrix(np.random.default_rng(42), n_classes))
+
+        print(
+            f"{n_classes:>8} {n_rows:>10} {t_loop:>10.4f} {t_vec:>10.4f} "
+            f"{t_loop / t_vec:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+asyncio launcher for all experimental runs in an experiment.
+
+With ``--exec-mode=async``, the sample engines give GNU parallel a single
+command per experiment: this script, which then launches each run of the
+experiment itself. Runs are started directly with
+``asyncio.create_subprocess_exec()`` (no shell per run), and:
+
+- At most ``--jobs`` run at once. A new run starts as soon as ANY run finishes,
+  so runs with uneven durations keep all slots busy.
+
+- No new run starts while the kernel has more than ``--max-dirty-mib`` of
+  file data waiting to be written to disk, so runs producing lots of output
+  can't outpace the disk (backpressure).
+
+- Each run's stdout/stderr go straight to ``<log-dir>/<run>.{stdout,stderr}``;
+  the children write to the files themselves, so a run is never blocked on
+  the launcher reading its output.
+
+The command for a run is everything after ``--``, with ``{input}`` replaced by
+the path to the run's input file, minus its extension (the same path SIERRA
+passes to ``exec_run_cmds()``). The exit code is non-zero if any run failed;
+other runs are not affected by one failing, same as GNU parallel.
+
+Only stdlib modules are used, to keep startup overhead small.
+
+Usage::
+
+    asynclaunch.py --jobs J --n-runs N --input-stem S --log-dir D -- CMD...
+"""
+
+# Core packages
+import argparse
+import asyncio
+import os
+import pathlib
+import sys
+import time
+
+# 3rd party packages
+
+# Project packages
+
+kINPUT = "{input}"
+
+_kBACKPRESSURE_POLL = 0.05
+
+
+def _dirty_bytes() -> int:
+    """
+    Get how much file data the kernel has yet to write to disk.
+
+    Returns 0 if unknown (e.g., not on Linux), which disables backpressure.
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            fields = dict(line.split(":", 1) for line in f)
+    except OSError:
+        return 0
+
+    return sum(int(fields[k].split()[0]) * 1024 for k in ["Dirty", "Writeback"])
+
+
+async def _backpressure(max_dirty: int) -> None:
+    while _dirty_bytes() > max_dirty:
+        await asyncio.sleep(_kBACKPRESSURE_POLL)
+
+
+async def _run(
+    args: argparse.Namespace,
+    cmd: list[str],
+    run_num: int,
+    slots: asyncio.Semaphore,
+) -> int:
+    run_stem = f"{args.input_stem}_run{run_num}"
+    argv = [a.replace(kINPUT, run_stem) for a in cmd]
+    log_stem = pathlib.Path(args.log_dir) / pathlib.Path(run_stem).name
+
+    async with slots:
+        await _backpressure(args.max_dirty_mib * 1024**2)
+
+        with open(f"{log_stem}.stdout", "wb") as out, open(
+            f"{log_stem}.stderr", "wb"
+        ) as err:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdin=asyncio.subprocess.DEVNULL, stdout=out, stderr=err
+            )
+            try:
+                returncode = await proc.wait()
+            except asyncio.CancelledError:
+                proc.kill()
+                await proc.wait()
+                raise
+
+    if returncode != 0:
+        print(
+            f"Run {run_stem} failed with exit code {returncode}; see {log_stem}.stderr",
+            file=sys.stderr,
+        )
+
+    return returncode
+
+
+async def _launch(args: argparse.Namespace, cmd: list[str]) -> int:
+    pathlib.Path(args.log_dir).mkdir(parents=True, exist_ok=True)
+    slots = asyncio.Semaphore(args.jobs or os.cpu_count())
+
+    start = time.time()
+    returncodes = await asyncio.gather(
+        *[_run(args, cmd, i, slots) for i in range(0, args.n_runs)]
+    )
+    n_failed = sum(1 for rc in returncodes if rc != 0)
+
+    print(
+        f"{args.n_runs - n_failed}/{args.n_runs} runs of {args.input_stem} "
+        f"succeeded in {time.time() - start:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if n_failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Launch all experimental runs in an experiment with asyncio."
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=0, help="Max concurrent runs (0=all cores)."
+    )
+    parser.add_argument("--n-runs", type=int, required=True, help="# of runs.")
+    parser.add_argument(
+        "--input-stem",
+        required=True,
+        help="Path to the run input files, minus the _run<N> suffix.",
+    )
+    parser.add_argument(
+        "--log-dir", required=True, help="Directory for per-run stdout/stderr."
+    )
+    parser.add_argument(
+        "--max-dirty-mib",
+        type=int,
+        default=1024,
+        help="Don't start runs while more than this much is waiting to be written.",
+    )
+    parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command per run.")
+
+    args = parser.parse_args()
+    cmd = args.cmd[1:] if args.cmd and args.cmd[0] == "--" else args.cmd
+    return asyncio.run(_launch(args, cmd))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
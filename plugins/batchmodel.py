@@ -0,0 +1,174 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Intra-experiment models which are run for all experiments in a batch at once.
+
+SIERRA runs each intra-experiment model once per experiment, via
+``IIntraExpModel1D.run()``. For models which are cheap per experiment, the
+overhead of doing that N times dominates. :class:`BatchIntraExpModel1D`
+implements ``run()`` so that the first call computes the model for ALL
+experiments SIERRA will ask for (from that experiment to the end of
+``--exp-range``, for which ``should_run()`` is true) via :meth:`run_batch`, and
+each call after that just hands back its experiment's result.
+
+Models which can be vectorized across experiments override :meth:`run_batch`.
+Models which can't just implement :meth:`run_exp`, and the default
+:meth:`run_batch` runs it for each experiment in a process pool, with the
+number of workers set by the ``workers`` model parameter in ``models.yaml`` (0
+for all cores; the default is 1). Workers are forked, for the same reasons as
+in :mod:`plugins.expgen`.
+"""
+
+# Core packages
+import collections.abc
+import concurrent.futures as cf
+import copy
+import logging
+import multiprocessing
+import os
+import typing as tp
+
+# 3rd party packages
+import polars as pl
+
+# Project packages
+from sierra.core.variables import batch_criteria as bc
+from sierra.core import types, exproot
+
+_logger = logging.getLogger(__name__)
+
+# Inherited by forked workers; everything needed to run the model for an
+# experiment other than its index into the batch.
+_JOB = None
+
+
+def _run_exp(i: int) -> list[pl.DataFrame]:
+    model, criteria, exp_nums, cmdopts, pathsets = _JOB
+    return model.run_exp(criteria, exp_nums[i], cmdopts, pathsets[i])
+
+
+class _Siblings(collections.abc.Sequence):
+    """
+    The paths for other experiments in the same batch as a given experiment.
+
+    Created on access, since vectorized models often don't need them.
+    """
+
+    def __init__(self, pathset: exproot.PathSet, exp_names: list[str]) -> None:
+        self.pathset = pathset
+        self.exp_names = exp_names
+
+    def __len__(self) -> int:
+        return len(self.exp_names)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        sibling = copy.copy(self.pathset)
+        for attr in ["input_root", "output_root", "graph_root", "model_root", "stat_root"]:
+            root = getattr(self.pathset, attr)
+            setattr(sibling, attr, root.with_name(self.exp_names[i]))
+
+        return sibling
+
+
+class BatchIntraExpModel1D:
+    """Base class for intra-experiment models run across a batch at once.
+
+    Derived classes must implement either :meth:`run_batch` or
+    :meth:`run_exp`, as well as ``should_run()`` and ``__repr__()`` from
+    ``IIntraExpModel1D``.
+    """
+
+    def __init__(self, params: types.YAMLDict) -> None:
+        self.workers = params.get("workers", 1)
+        self._results = {}  # type: dict[int, list[pl.DataFrame]]
+
+    def run(
+        self,
+        criteria: bc.XVarBatchCriteria,
+        exp_num: int,
+        cmdopts: types.Cmdopts,
+        pathset: exproot.PathSet,
+    ) -> list[pl.DataFrame]:
+        # SIERRA asks for experiments in order, so anything not already
+        # computed is the start of a new batch.
+        if exp_num not in self._results:
+            exp_names = criteria.gen_exp_names()
+            exp_nums = [
+                i
+                for i in range(exp_num, self._last_exp(cmdopts, len(exp_names)) + 1)
+                if i == exp_num or self.should_run(criteria, cmdopts, i)
+            ]
+            pathsets = _Siblings(pathset, [exp_names[i] for i in exp_nums])
+
+            _logger.debug(
+                "Run intra-experiment model %s for %d experiments",
+                str(self),
+                len(exp_nums),
+            )
+            dfs = self.run_batch(criteria, exp_nums, cmdopts, pathsets)
+            self._results = dict(zip(exp_nums, dfs))
+
+        return self._results.pop(exp_num)
+
+    def run_batch(
+        self,
+        criteria: bc.XVarBatchCriteria,
+        exp_nums: list[int],
+        cmdopts: types.Cmdopts,
+        pathsets: tp.Sequence[exproot.PathSet],
+    ) -> list[list[pl.DataFrame]]:
+        """Run the model for each of the specified experiments.
+
+        Returns the list of dataframes ``IIntraExpModel1D.run()`` would return
+        for each experiment, in the same order as ``exp_nums``.
+
+        By default, runs :meth:`run_exp` for each experiment, in a process pool
+        if there is more than one worker.
+        """
+        global _JOB
+
+        n_workers = self.workers or os.cpu_count()
+        if n_workers == 1 or len(exp_nums) == 1:
+            return [
+                self.run_exp(criteria, exp_num, cmdopts, pathset)
+                for exp_num, pathset in zip(exp_nums, pathsets)
+            ]
+
+        _JOB = (self, criteria, exp_nums, cmdopts, pathsets)
+        try:
+            with cf.ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                return list(pool.map(_run_exp, range(len(exp_nums))))
+        finally:
+            _JOB = None
+
+    def run_exp(
+        self,
+        criteria: bc.XVarBatchCriteria,
+        exp_num: int,
+        cmdopts: types.Cmdopts,
+        pathset: exproot.PathSet,
+    ) -> list[pl.DataFrame]:
+        """Run the model for a single experiment.
+
+        Same semantics as ``IIntraExpModel1D.run()``; only needed if
+        :meth:`run_batch` is not overridden.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _last_exp(cmdopts: types.Cmdopts, n_exp: int) -> int:
+        if cmdopts.get("exp_range") is not None:
+            return min(int(cmdopts["exp_range"].split(":")[1]), n_exp - 1)
+
+        return n_exp - 1
+
+
+__all__ = ["BatchIntraExpModel1D"]
@@ -0,0 +1,62 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+
+# Core packages
+import argparse
+
+# 3rd party packages
+
+# Project packages
+from sierra.core import types
+from sierra.plugins import PluginCmdline
+from plugins.collate import collator
+
+
+def build(parents: list[argparse.ArgumentParser], stages: list[int]) -> PluginCmdline:
+    """
+    Get a cmdline parser supporting the ``plugins.collate`` processing plugin.
+    """
+    cmdline = PluginCmdline(parents, stages)
+    cmdline.stage3.add_argument(
+        "--collate-retain",
+        choices=collator.kRETAIN,
+        default="keep",
+        help="""
+             What to do with :term:`Raw Output Data` files once
+             ``plugins.collate`` has collated their experiment; the same as
+             ``--exec-collate-retain``, for experiments collated in stage 3:
+
+             - ``keep`` - Nothing.
+
+             - ``compact`` - Pack the output directories of all runs in the
+               experiment into a single archive under
+               ``<batchroot>/compacted``, and delete them. Raw outputs are
+               then read from the archives by ``plugins.collate`` and
+               ``plugins.summarystats`` (instead of ``proc.statistics``); no
+               other ``--proc`` plugin reads them, and a warning is logged if
+               any are selected after ``plugins.collate``.
+
+             - ``delete`` - Delete each run's output directory.
+
+             Run ``plugins.collate`` after any other ``--proc`` plugins which
+             read raw outputs from disk.
+             """
+        + cmdline.stage_usage_doc([3]),
+    )
+    return cmdline
+
+
+def to_cmdopts(args: argparse.Namespace) -> types.Cmdopts:
+    return {
+        "collate_retain": args.collate_retain,
+    }
+
+
+def sphinx_cmdline_stage3():
+    return build([], [3]).parser
+
+
+__all__ = ["build", "to_cmdopts", "sphinx_cmdline_stage3"]
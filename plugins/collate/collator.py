@@ -0,0 +1,528 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Collation of a single experiment, shared by stage 2 and stage 3.
+
+Produces the same :term:`Collated Output Data` as ``proc.collate`` (same files
+matched from ``collate.yaml``, same column order, same CSV output), so results
+are interchangeable. The difference is bookkeeping: each collated experiment
+gets a manifest under ``<batchroot>/collate``, recording the options it was
+collated with, the output files of each run which went into it, and the
+collated files derived from them. Experiments are then only collated again as
+far as their runs changed. Raw outputs of runs which were compacted (see
+:mod:`plugins.collate.compacted`) are read from the experiment's archive.
+"""
+
+# Core packages
+import hashlib
+import importlib
+import io
+import json
+import logging
+import os
+import pathlib
+import shutil
+import typing as tp
+
+# 3rd party packages
+import polars as pl
+import yaml
+
+# Project packages
+from sierra.core import types, utils, config
+from plugins.collate import compacted
+
+_logger = logging.getLogger(__name__)
+
+# Under <batchroot>; not somewhere SIERRA looks for (or puts) things.
+kSTATE_LEAF = "collate"
+
+kRETAIN = ["keep", "compact", "delete"]
+
+# Same readers as the storage.csv/storage.arrow plugins, but lazy
+_kSCANNERS = {
+    ".csv": lambda path: pl.scan_csv(path, separator=","),
+    ".arrow": pl.scan_ipc,
+    ".parquet": pl.scan_parquet,
+}  # type: tp.Dict[str, tp.Callable[[pathlib.Path], pl.LazyFrame]]
+
+# The same, for files read from an archive; only the columns given are parsed
+_kREADERS = {
+    ".csv": lambda f, cols: pl.read_csv(f, separator=",", columns=cols),
+    ".arrow": lambda f, cols: pl.read_ipc(f, columns=cols),
+    ".parquet": lambda f, cols: pl.read_parquet(f, columns=cols),
+}  # type: tp.Dict[str, tp.Callable[[tp.BinaryIO, tp.List[str]], pl.DataFrame]]
+
+
+def make_opts(
+    project_config_root: tp.Union[str, pathlib.Path],
+    storage: str,
+    df_homogenize: str,
+) -> types.SimpleDict:
+    """
+    Get everything which affects the collated output for an experiment.
+    """
+    project_config_root = pathlib.Path(project_config_root)
+    with utils.utf8open(project_config_root / config.PROJECT_YAML.main) as f:
+        main_config = yaml.safe_load(f)
+
+    try:
+        with utils.utf8open(project_config_root / config.PROJECT_YAML.collate) as f:
+            collate_config = yaml.safe_load(f)
+    except FileNotFoundError:
+        _logger.warning(
+            "%s does not exist!", project_config_root / config.PROJECT_YAML.collate
+        )
+        collate_config = {}
+
+    return {
+        "run_metrics_leaf": main_config["sierra"]["run"]["run_metrics_leaf"],
+        "intra_exp": collate_config.get("intra-exp") or [],
+        "storage": storage,
+        "df_homogenize": df_homogenize,
+    }
+
+
+def batch_root_of(exp_output_root: pathlib.Path) -> pathlib.Path:
+    # <batchroot>/exp-outputs/<exp>
+    return exp_output_root.parent.parent
+
+
+def stat_interexp_root_of(batch_root: pathlib.Path) -> pathlib.Path:
+    # Same as batchroot.PathSet.stat_interexp_root
+    return batch_root / "statistics" / "inter-exp"
+
+
+def state_root_of(batch_root: pathlib.Path) -> pathlib.Path:
+    return batch_root / kSTATE_LEAF
+
+
+def collate(
+    exp_output_root: pathlib.Path,
+    stat_interexp_root: pathlib.Path,
+    opts: types.SimpleDict,
+    policy: str,
+) -> str:
+    """
+    Collate an experiment, reusing what was collated before where possible.
+
+    Each run's output files are compared against the experiment's manifest by
+    size/mtime, and by content hash if those differ; compacted runs are
+    compared by the size/CRC in their archive's index. Only runs which were
+    added or whose outputs changed are read, and their columns are merged into
+    the existing collated files; runs which were removed are dropped from
+    them. The result is the same as collating everything again.
+
+    Returns what was done: ``unchanged``, ``merged`` or ``collated``.
+    """
+    storage = _storage_plugin(opts["storage"])
+    leaf = opts["run_metrics_leaf"]
+
+    prev = manifest_read(exp_output_root)
+    if prev is not None and prev["key"] != _key(opts):
+        prev = None
+
+    prev_runs = prev["runs"] if prev else {}
+    prev_deleted = set(prev["deleted"]) if prev else set()
+    archive = compacted.Archive.of(exp_output_root)
+
+    # Manifest entries for each run, in the order proc.collate reads them
+    runs = {}  # type: tp.Dict[str, tp.Dict[str, tp.List]]
+    changed = []
+    deleted = []
+    packed = []
+    for run in exp_output_root.iterdir():
+        old = prev_runs.get(run.name)
+        if run.name in prev_deleted and not (run / leaf).exists():
+            # Raw outputs were deleted after they were collated
+            runs[run.name] = old
+            deleted.append(run.name)
+            continue
+
+        if archive is not None and archive.has(run.name) and not (run / leaf).exists():
+            runs[run.name] = _scan_archived(archive, run.name, storage)
+            if old is None or _digests(runs[run.name]) != _digests(old):
+                changed.append(run.name)
+            packed.append(run.name)
+            continue
+
+        runs[run.name] = _scan_run(run / leaf, storage, old or {})
+        if old is None or _digests(runs[run.name]) != _digests(old):
+            changed.append(run.name)
+
+    outputs = _plan(runs, exp_output_root.name, opts)
+    mergeable = (
+        prev is not None
+        and outputs == prev["outputs"]
+        and all((stat_interexp_root / o).exists() for o in outputs)
+    )
+
+    if mergeable and not changed and list(runs) == list(prev_runs):
+        status = "unchanged"
+    elif mergeable:
+        _logger.info(
+            "Merging outputs from %s/%s runs into %s...",
+            len(changed),
+            len(runs),
+            exp_output_root.name,
+        )
+        _collate_runs(
+            exp_output_root,
+            stat_interexp_root,
+            opts,
+            storage,
+            archive,
+            outputs,
+            changed,
+        )
+        status = "merged"
+    else:
+        _logger.info("Collating outputs from %s...", exp_output_root.name)
+        if deleted:
+            _logger.warning(
+                "Raw outputs of %s/%s runs in %s were deleted; they can't be "
+                "collated again",
+                len(deleted),
+                len(runs),
+                exp_output_root.name,
+            )
+        _collate_runs(
+            exp_output_root, stat_interexp_root, opts, storage, archive, outputs, None
+        )
+        status = "collated"
+
+    if archive is not None:
+        archive.close()
+
+    retain(exp_output_root, opts, policy)
+    if policy == "delete":
+        deleted = list(runs)
+        packed = []
+    elif policy == "compact":
+        # Entries as the next pass will find them, so it doesn't read the runs
+        # again just because they moved into the archive.
+        packed = [r for r in runs if r not in deleted]
+        archive = compacted.Archive.of(exp_output_root)
+        for run_name in packed:
+            runs[run_name] = _scan_archived(archive, run_name, storage)
+        archive.close()
+
+    manifest_write(
+        exp_output_root,
+        {
+            "key": _key(opts),
+            "runs": runs,
+            "deleted": deleted,
+            "compacted": packed,
+            "outputs": outputs,
+        },
+    )
+    return status
+
+
+def _scan_run(
+    root: pathlib.Path, storage, prev: tp.Dict[str, tp.List]
+) -> tp.Dict[str, tp.List]:
+    """
+    Get ``{item: [size, mtime_ns, sha256]}`` for each output file of a run.
+
+    Only files which look modified (size/mtime) are hashed.
+    """
+    files = {}
+    for item in root.rglob("*"):
+        if not item.is_file():
+            continue
+
+        st = item.stat()
+        if not any(storage.supports_input(s) for s in item.suffixes) or (
+            st.st_size == 0
+        ):
+            continue
+
+        key = item.relative_to(root).as_posix()
+        old = prev.get(key)
+        if old is not None and old[:2] == [st.st_size, st.st_mtime_ns]:
+            digest = old[2]
+        else:
+            digest = _hash(item)
+
+        files[key] = [st.st_size, st.st_mtime_ns, digest]
+
+    return files
+
+
+def _scan_archived(
+    archive: compacted.Archive, run: str, storage
+) -> tp.Dict[str, tp.List]:
+    """
+    Get ``{item: [size, 0, crc32]}`` for each output file of a compacted run.
+
+    Sizes and CRCs are taken from the archive's index, so nothing is read.
+    They never match entries scanned from disk, so runs compacted or put back
+    on disk since the last pass are read again.
+    """
+    return {
+        item: [info.file_size, 0, f"crc32:{info.CRC:08x}"]
+        for item, info in archive.infos(run).items()
+        if info.file_size > 0
+        and any(storage.supports_input(s) for s in pathlib.PurePosixPath(item).suffixes)
+    }
+
+
+def _plan(
+    runs: tp.Dict[str, tp.Dict[str, tp.List]], exp_name: str, opts: types.SimpleDict
+) -> tp.Dict[str, tp.Dict[str, str]]:
+    """
+    Get the collated files to write, and which item/column each comes from.
+
+    Columns are collated from files in the order proc.collate finds them.
+    Keys are relative to ``stat_interexp_root``.
+    """
+    to_collate = {}  # type: tp.Dict[str, tp.List[str]]
+    for files in runs.values():
+        for item in files:
+            cols = to_collate.setdefault(item, [])
+            name = pathlib.PurePosixPath(item).name
+            for conf in opts["intra_exp"]:
+                if conf["file"] in name:
+                    cols.extend(c for c in conf["cols"] if c not in cols)
+
+    outputs = {}
+    for item, cols in to_collate.items():
+        item_path = pathlib.PurePosixPath(item)
+        for col in cols:
+            stem = f"{item_path.stem}-{col}" + config.STORAGE_EXT["csv"]
+            out = pathlib.PurePosixPath(exp_name) / item_path.parent / stem
+            outputs[str(out)] = {"item": item, "col": col}
+
+    return outputs
+
+
+def _collate_runs(
+    exp_output_root: pathlib.Path,
+    stat_interexp_root: pathlib.Path,
+    opts: types.SimpleDict,
+    storage,
+    archive: tp.Optional[compacted.Archive],
+    outputs: tp.Dict[str, tp.Dict[str, str]],
+    changed: tp.Optional[tp.List[str]],
+) -> None:
+    """
+    Write collated files, reading raw outputs from the changed runs.
+
+    Columns for other runs are taken from the existing collated files. If
+    ``changed`` is None, all runs are read. Runs without raw outputs on disk
+    are read from ``archive``, if they were compacted.
+    """
+    leaf = opts["run_metrics_leaf"]
+    runs = list(exp_output_root.iterdir())
+    to_read = [r for r in runs if changed is None or r.name in changed]
+
+    by_item = {}  # type: tp.Dict[str, tp.List[str]]
+    for out, src in outputs.items():
+        by_item.setdefault(src["item"], []).append(out)
+
+    for item, item_outputs in by_item.items():
+        cols = [outputs[out]["col"] for out in item_outputs]
+        scans = {}
+        for run in to_read:
+            path = run / leaf / item
+            if path.exists() and path.stat().st_size > 0:
+                scans[run.name] = _scan(path, run, storage).select(cols)
+            elif (
+                archive is not None
+                and archive.has(run.name, item)
+                and archive.items(run.name)[item] > 0
+            ):
+                df = _read_archived(archive, run, item, cols, storage)
+                scans[run.name] = df.lazy()
+
+        # Only the collated columns are parsed, and runs are read in parallel
+        # on polars' thread pool.
+        dfs = dict(zip(scans, pl.collect_all(scans.values())))
+
+        if len(dfs) != len(to_read):
+            _logger.warning(
+                "Data not gathered for %s from all experimental runs in %s: "
+                "%s runs != %s",
+                item,
+                exp_output_root.name,
+                len(dfs),
+                len(to_read),
+            )
+
+        for out in item_outputs:
+            col = outputs[out]["col"]
+            path = stat_interexp_root / out
+            prev = _csv().df_read(path) if changed is not None else None
+
+            # Same column order as collating all runs again
+            collated = {}
+            for run in runs:
+                if run.name in dfs:
+                    collated[run.name] = dfs[run.name][col]
+                elif prev is not None and run in to_read:
+                    continue
+                elif prev is not None and run.name in prev.columns:
+                    collated[run.name] = prev[run.name]
+
+            utils.dir_create_checked(path.parent, exist_ok=True)
+            _csv().df_write(
+                utils.df_fill(pl.DataFrame(collated), opts["df_homogenize"]), path
+            )
+
+
+def retain(exp_output_root: pathlib.Path, opts: types.SimpleDict, policy: str) -> None:
+    """
+    Apply a retention policy to the raw outputs of a collated experiment.
+
+    - ``keep`` - Leave them as-is.
+
+    - ``compact`` - Pack each run's output directory (``run_metrics_leaf``)
+      into the experiment's archive, and remove it (see
+      :func:`plugins.collate.compacted.compact`). They can still be collated
+      again, and are read by ``--proc plugins.summarystats``.
+
+    - ``delete`` - Remove each run's output directory, and the experiment's
+      archive if it was compacted before. Anything else the engine put in the
+      run directory (e.g., profiling sidecars) is left. The runs' columns are
+      still kept when other runs are merged in later.
+    """
+    if policy == "keep":
+        return
+
+    if policy == "compact":
+        compacted.compact(exp_output_root, opts["run_metrics_leaf"])
+        return
+
+    for run in exp_output_root.iterdir():
+        shutil.rmtree(run / opts["run_metrics_leaf"], ignore_errors=True)
+
+    compacted.remove(exp_output_root)
+
+
+def manifest_read(exp_output_root: pathlib.Path) -> tp.Optional[types.SimpleDict]:
+    try:
+        with utils.utf8open(_manifest_path(exp_output_root)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def manifest_write(exp_output_root: pathlib.Path, manifest: types.SimpleDict) -> None:
+    """
+    Write the manifest for an experiment.
+
+    - ``key`` - Hash of the options it was collated with.
+
+    - ``runs`` - ``{run: {item: [size, mtime_ns, sha256]}}`` for the output
+      files of each run collated, in collation order (``[size, 0, crc32]``
+      for compacted runs).
+
+    - ``deleted`` - Runs whose raw outputs were deleted after collating.
+
+    - ``compacted`` - Runs whose raw outputs were compacted after collating.
+
+    - ``outputs`` - ``{collated file: {"item": item, "col": col}}``, relative
+      to ``<batchroot>/statistics/inter-exp``.
+    """
+    path = _manifest_path(exp_output_root)
+    utils.dir_create_checked(path.parent, exist_ok=True)
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    with utils.utf8open(tmp, "w") as f:
+        json.dump(manifest, f)
+
+    tmp.replace(path)
+
+
+def _manifest_path(exp_output_root: pathlib.Path) -> pathlib.Path:
+    state_root = state_root_of(batch_root_of(exp_output_root))
+    return state_root / f"{exp_output_root.name}.json"
+
+
+def _scan(path: pathlib.Path, run: pathlib.Path, storage) -> pl.LazyFrame:
+    """
+    Lazily read a run output file, so columns not selected aren't parsed.
+
+    Formats polars can't scan are read in full with the ``--storage`` plugin.
+    Scans read the same types as the storage plugins do (e.g., CSV schemas are
+    inferred the same way), so collated outputs are identical either way.
+    """
+    if path.suffix in _kSCANNERS:
+        return _kSCANNERS[path.suffix](path)
+
+    return storage.df_read(path, run_output_root=run).lazy()
+
+
+def _read_archived(
+    archive: compacted.Archive,
+    run: pathlib.Path,
+    item: str,
+    cols: tp.List[str],
+    storage,
+) -> pl.DataFrame:
+    """
+    Read the columns of a compacted run output file, from memory.
+
+    Same types as :func:`_scan` reads from disk.
+    """
+    f = io.BytesIO(archive.read_bytes(run.name, item))
+    suffix = pathlib.PurePosixPath(item).suffix
+    if suffix in _kREADERS:
+        return _kREADERS[suffix](f, cols)
+
+    return storage.df_read(f, run_output_root=run).select(cols)
+
+
+def _digests(files: tp.Dict[str, tp.List]) -> tp.Dict[str, str]:
+    return {item: entry[2] for item, entry in files.items()}
+
+
+def _hash(path: pathlib.Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def _key(opts: types.SimpleDict) -> str:
+    return hashlib.sha256(
+        json.dumps(opts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _storage_plugin(name: str):
+    """
+    Import a ``--storage`` plugin without going through SIERRA's plugin manager.
+
+    This is also run outside of SIERRA, in stage 2.
+    """
+    # Plugins are named relative to a directory on the plugin search path:
+    # SIERRA's own, or one on SIERRA_PLUGIN_PATH/PYTHONPATH (e.g., this repo).
+    for module in [f"sierra.plugins.{name}.plugin", f"{name}.plugin"]:
+        try:
+            return importlib.import_module(module)
+        except ModuleNotFoundError:
+            continue
+
+    raise ValueError(f"Can't import storage plugin '{name}'")
+
+
+def _csv():
+    # proc.collate always writes collated outputs as CSV
+    return _storage_plugin("storage.csv")
+
+
+__all__ = [
+    "collate",
+    "make_opts",
+    "manifest_read",
+    "manifest_write",
+    "retain",
+]
@@ -0,0 +1,156 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Compaction of the raw outputs of a collated experiment into a single archive.
+
+Every run leaves several files (JSONSIM: six CSVs over three directories;
+ARGoS: one per tick for some outputs), so batches quickly run to millions of
+inodes. Compacting an experiment packs the ``run_metrics_leaf`` directory of
+each of its runs into one zip archive, ``<batchroot>/compacted/<exp>.zip``,
+with members ``<run>/<item>`` (``item`` relative to ``run_metrics_leaf``), and
+then removes the directories. Files are stored as-is, so anything reading them
+from the archive gets exactly what it would have read from disk. Zip archives
+are indexed, so single files are read without extracting anything else.
+
+Run directories themselves are left alone: SIERRA expects one per run.
+"""
+
+# Core packages
+import os
+import pathlib
+import shutil
+import typing as tp
+import zipfile
+
+# 3rd party packages
+
+# Project packages
+
+# Under <batchroot>, next to exp-outputs/
+kARCHIVE_LEAF = "compacted"
+
+# --proc plugins which read raw outputs from archives; others only look on disk
+kREADERS = ["plugins.summarystats", "plugins.collate"]
+
+
+class Archive:
+    """
+    Read-only access to the compacted raw outputs of an experiment.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+
+        # {run: {item: ZipInfo}}
+        self._index = {}  # type: tp.Dict[str, tp.Dict[str, zipfile.ZipInfo]]
+        for info in self._zip.infolist():
+            run, item = info.filename.split("/", 1)
+            self._index.setdefault(run, {})[item] = info
+
+    @staticmethod
+    def of(exp_output_root: pathlib.Path) -> tp.Optional["Archive"]:
+        """
+        Get the archive for an experiment, or None if it hasn't been compacted.
+        """
+        path = archive_path(exp_output_root)
+        return Archive(path) if path.exists() else None
+
+    def runs(self) -> tp.List[str]:
+        return list(self._index)
+
+    def items(self, run: str) -> tp.Dict[str, int]:
+        """
+        Get ``{item: size}`` for the files compacted from a run.
+        """
+        return {item: info.file_size for item, info in self.infos(run).items()}
+
+    def infos(self, run: str) -> tp.Dict[str, zipfile.ZipInfo]:
+        """
+        Get ``{item: ZipInfo}`` for the files compacted from a run.
+
+        Sizes and CRCs come from the archive's index, so nothing is read.
+        """
+        return self._index.get(run, {})
+
+    def has(self, run: str, item: tp.Optional[str] = None) -> bool:
+        if item is None:
+            return run in self._index
+
+        return item in self._index.get(run, {})
+
+    def read_bytes(self, run: str, item: str) -> bytes:
+        return self._zip.read(self._index[run][item])
+
+    def copy_run(self, run: str, dst: zipfile.ZipFile) -> None:
+        """
+        Copy the files compacted from a run into another archive, as-is.
+        """
+        for info in self._index[run].values():
+            dst.writestr(info, self._zip.read(info))
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+def archive_path(exp_output_root: pathlib.Path) -> pathlib.Path:
+    # <batchroot>/exp-outputs/<exp> -> <batchroot>/compacted/<exp>.zip
+    return exp_output_root.parent.parent / kARCHIVE_LEAF / f"{exp_output_root.name}.zip"
+
+
+def compact(exp_output_root: pathlib.Path, run_metrics_leaf: str) -> tp.List[str]:
+    """
+    Compact the raw outputs of an experiment, removing them from disk.
+
+    Runs with outputs on disk replace whatever the archive had for them (e.g.,
+    if they were run again after the experiment was compacted); other runs
+    already in the archive are carried over.
+
+    Returns the runs in the archive.
+    """
+    path = archive_path(exp_output_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    prev = Archive(path) if path.exists() else None
+    raw = [
+        run for run in exp_output_root.iterdir() if (run / run_metrics_leaf).is_dir()
+    ]
+    runs = []
+
+    # Written alongside and moved into place, so the archive is never partial.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for run in raw:
+            root = run / run_metrics_leaf
+            for item in sorted(root.rglob("*")):
+                if item.is_file():
+                    zf.write(item, f"{run.name}/{item.relative_to(root).as_posix()}")
+
+            runs.append(run.name)
+
+        if prev is not None:
+            for run in prev.runs():
+                if run in runs:
+                    continue
+
+                prev.copy_run(run, zf)
+                runs.append(run)
+
+            prev.close()
+
+    tmp.replace(path)
+
+    for run in raw:
+        shutil.rmtree(run / run_metrics_leaf, ignore_errors=True)
+
+    return runs
+
+
+def remove(exp_output_root: pathlib.Path) -> None:
+    archive_path(exp_output_root).unlink(missing_ok=True)
+
+
+__all__ = ["Archive", "archive_path", "compact", "remove"]
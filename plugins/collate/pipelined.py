@@ -0,0 +1,191 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Collate experiments during stage 2, as soon as all their runs finish.
+
+Hooked into each experimental run's command line by the sample engines when
+``--exec-collate`` is passed:
+
+- ``pipelined.py run-done --status $? --run-output-root R ...`` runs after
+  each run. If the run succeeded, it is marked as done; whichever run
+  completes the experiment then collates it (in the slot the run just
+  finished with), while runs from other experiments keep going.
+
+- ``pipelined.py exp-done --status $? --exp-output-root E ...`` runs after
+  all runs in an experiment instead, with ``--exec-mode=async``.
+
+After collating, raw run outputs are kept or deleted per ``--retain``, and
+the experiment's manifest is updated, so ``--proc plugins.collate`` skips it
+in stage 3 unless its runs change afterwards. Experiments with failed runs
+aren't collated here, so the stage 3 plugin collates (and warns about) them as
+usual. The exit code is always the run's, so collation never fails a run,
+even if this script can't start (e.g., can't import what it needs).
+
+This is run as a script, outside of SIERRA, so it finds the rest of this repo
+relative to itself; SIERRA only puts plugin directories on ``sys.path`` in its
+own process.
+
+Usage::
+
+    pipelined.py run-done --status S --run-output-root R --n-runs N OPTS...
+    pipelined.py exp-done --status S --exp-output-root E OPTS...
+"""
+
+# Core packages
+import argparse
+import os
+import pathlib
+import shutil
+import sys
+import traceback
+
+# 3rd party packages
+
+# Project packages
+
+# Imported by main(), so failing to import fails like anything else would
+collator = None
+
+
+def run_done(args: argparse.Namespace) -> int:
+    run_output_root = pathlib.Path(args.run_output_root)
+    exp_output_root = run_output_root.parent
+
+    if args.status != 0:
+        return args.status
+
+    state_root = collator.state_root_of(collator.batch_root_of(exp_output_root))
+    done_root = state_root / f"{exp_output_root.name}.done"
+    done_root.mkdir(parents=True, exist_ok=True)
+    (done_root / run_output_root.name).touch()
+
+    if len(os.listdir(done_root)) < args.n_runs:
+        return args.status
+
+    # Runs finishing at the same time can all see the experiment as done;
+    # only one of them gets to collate it.
+    claim = state_root / f"{exp_output_root.name}.claim"
+    try:
+        os.close(os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return args.status
+
+    try:
+        _collate(args, exp_output_root)
+    finally:
+        # If runs are re-run later, collation waits for them all again.
+        shutil.rmtree(done_root, ignore_errors=True)
+        claim.unlink(missing_ok=True)
+
+    return args.status
+
+
+def exp_done(args: argparse.Namespace) -> int:
+    exp_output_root = pathlib.Path(args.exp_output_root)
+
+    if args.status == 0:
+        _collate(args, exp_output_root)
+
+    return args.status
+
+
+def _collate(args: argparse.Namespace, exp_output_root: pathlib.Path) -> None:
+    batch_root = collator.batch_root_of(exp_output_root)
+    opts = collator.make_opts(
+        args.project_config_root, args.storage, args.df_homogenize
+    )
+
+    try:
+        collator.collate(
+            exp_output_root,
+            collator.stat_interexp_root_of(batch_root),
+            opts,
+            args.retain,
+        )
+    except Exception:
+        traceback.print_exc()
+        print(
+            f"Collating {exp_output_root.name} failed; it will be collated in "
+            "stage 3 instead",
+            file=sys.stderr,
+        )
+
+
+def main() -> int:
+    try:
+        global collator
+        sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+        from plugins.collate import collator
+
+        args = _parser().parse_args()
+        return {"run-done": run_done, "exp-done": exp_done}[args.op](args)
+    except (Exception, SystemExit) as e:
+        if isinstance(e, SystemExit) and not e.code:
+            raise
+
+        status = _passed_status(sys.argv[1:])
+        traceback.print_exc()
+        print(
+            f"Collation failed; exiting with the run's status ({status})",
+            file=sys.stderr,
+        )
+        return status
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Collate experiments during stage 2, as soon as their runs finish."
+    )
+    sub = parser.add_subparsers(dest="op", required=True)
+
+    run_p = sub.add_parser("run-done", help="Mark a run as done.")
+    run_p.add_argument(
+        "--run-output-root", required=True, help="Output directory of the run."
+    )
+    run_p.add_argument(
+        "--n-runs", type=int, required=True, help="# of runs in the experiment."
+    )
+
+    exp_p = sub.add_parser("exp-done", help="Mark all runs in an experiment as done.")
+    exp_p.add_argument(
+        "--exp-output-root", required=True, help="Output directory of the experiment."
+    )
+
+    for p in [run_p, exp_p]:
+        p.add_argument(
+            "--status", type=int, required=True, help="Exit status of the run(s)."
+        )
+        p.add_argument(
+            "--project-config-root",
+            required=True,
+            help="Directory containing the project's main.yaml and collate.yaml.",
+        )
+        p.add_argument("--storage", required=True, help="The --storage plugin.")
+        p.add_argument("--df-homogenize", required=True, help="See --df-homogenize.")
+        p.add_argument(
+            "--retain",
+            choices=collator.kRETAIN,
+            default="keep",
+            help="What to do with raw run outputs after collating.",
+        )
+
+    return parser
+
+
+def _passed_status(argv: list[str]) -> int:
+    # Without argparse: whatever went wrong may have been parsing them
+    for i, arg in enumerate(argv[:-1]):
+        if arg == "--status":
+            try:
+                return int(argv[i + 1])
+            except ValueError:
+                break
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Drop-in replacement for ``proc.collate`` which reuses pipelined collation.
+
+Use with ``--proc ... plugins.collate`` instead of ``proc.collate``.
+Experiments are collated in parallel, the same way ``proc.collate`` would, but
+incrementally (see :func:`plugins.collate.collator.collate`): experiments
+whose runs haven't changed since they were last collated (here, or during
+stage 2 by :mod:`plugins.collate.pipelined`) are skipped, and only the runs
+which changed are read for the rest. Afterwards, raw outputs are kept,
+compacted or deleted per ``--collate-retain``.
+"""
+
+# Core packages
+import multiprocessing as mp
+import logging
+
+# 3rd party packages
+
+# Project packages
+import sierra.core.variables.batch_criteria as bc
+from sierra.core import types, utils, batchroot
+from plugins.collate import collator, compacted
+
+_logger = logging.getLogger(__name__)
+
+
+def proc_batch_exp(
+    main_config: types.YAMLDict,
+    cmdopts: types.Cmdopts,
+    pathset: batchroot.PathSet,
+    criteria: bc.XVarBatchCriteria,
+) -> None:
+    """Generate :term:`Collated Output Data` files for each experiment."""
+    opts = collator.make_opts(
+        cmdopts["project_config_root"], cmdopts["storage"], cmdopts["df_homogenize"]
+    )
+    exp_to_proc = utils.exp_range_calc(
+        cmdopts["exp_range"], pathset.output_root, criteria.gen_exp_names()
+    )
+
+    if cmdopts["collate_retain"] == "compact":
+        # Plugins before this one have already read the raw outputs from disk
+        procs = cmdopts["proc"]
+        after = procs[procs.index("plugins.collate") + 1 :]
+        unread = [p for p in after if p not in compacted.kREADERS]
+        if unread:
+            _logger.warning(
+                "--proc %s can't read raw outputs compacted by "
+                "--collate-retain=compact",
+                " ".join(unread),
+            )
+
+    with mp.Pool(processes=cmdopts["processing_parallelism"]) as pool:
+        # Not a function in this module: SIERRA registers it under the same
+        # name as proc.collate, so functions here can't be pickled.
+        status = pool.starmap(
+            collator.collate,
+            [
+                (exp, pathset.stat_interexp_root, opts, cmdopts["collate_retain"])
+                for exp in exp_to_proc
+            ],
+        )
+
+    _logger.info(
+        "Collated %s/%s experiments: %s fully, %s by merging changed runs",
+        len(status) - status.count("unchanged"),
+        len(status),
+        status.count("collated"),
+        status.count("merged"),
+    )
+
+
+__all__ = ["proc_batch_exp"]
@@ -0,0 +1,426 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Faster experiment definitions for stage 1, for the JSON and YAML ``--expdef``
+plugins.
+
+Stage 1 resolves the same handful of paths (``$.exp_setup``, ``fuel``,
+``/config/noise``, ...) thousands of times, once per experiment and per run, and
+deep copies the whole template for every one. The plugins parse each path from
+scratch every time, which for ``jsonpath_ng`` means rebuilding its parser, and
+dominates stage 1 profiles.
+
+:func:`cached_class` derives a drop-in subclass of a plugin's ``ExpDef``
+which:
+
+- Compiles each path ONCE with the plugin's own path parser. Paths which only
+  name dict keys (the common case) become the tuple of keys leading to the node
+  they refer to, so that lookups are just dict walks. Anything else (wildcards,
+  indices, filters, ...) is left to the plugin.
+
+- Clones copy-on-write: ``copy.deepcopy()``, as SIERRA does for each experiment
+  and run, shares the tree with the original. Only the nodes along a path which
+  is actually changed are copied, the first time a clone changes them.
+  Modifications which go through the plugin take a full private copy first.
+
+- For JSON, remembers the trees it writes as whole templates, so that reading
+  them back later in the same stage 1 (e.g., each experiment's template,
+  written during scaffolding) via :func:`load` is a cheap clone instead of a
+  parse. YAML is always re-read, since ruamel's round trip does not guarantee
+  that an in-memory tree is written the same as the tree parsed back from it.
+
+Everything which modifies a tree must go through the ``ExpDef`` interface; any
+code modifying ``.tree`` directly could change the trees of other clones.
+"""
+
+# Core packages
+import copy
+import functools
+import json
+import logging
+import os
+import pathlib
+import typing as tp
+
+# 3rd party packages
+from sierra.core.experiment import definition
+from sierra.core import plugin as pm
+from sierra.core import utils
+
+# Project packages
+
+# Whole templates written this stage 1: path -> (signature of the file written,
+# definition which wrote it).
+_TEMPLATES: tp.Dict[str, tp.Tuple[tp.Tuple[int, int], definition.BaseExpDef]] = {}
+
+Keys = tp.Tuple[tp.Any, ...]
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_jsonpath(path: str) -> tp.Optional[Keys]:
+    import jsonpath_ng
+    from jsonpath_ng.ext import parse
+
+    def _keys(expr) -> tp.Optional[Keys]:
+        if isinstance(expr, jsonpath_ng.Root):
+            return ()
+
+        if isinstance(expr, jsonpath_ng.Fields):
+            if len(expr.fields) == 1 and expr.fields[0] != "*":
+                return (expr.fields[0],)
+            return None
+
+        if isinstance(expr, jsonpath_ng.Child) and isinstance(
+            expr.right, jsonpath_ng.Fields
+        ):
+            left = _keys(expr.left)
+            right = _keys(expr.right)
+            if left is not None and right is not None:
+                return left + right
+
+        return None
+
+    return _keys(parse(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_yamlpath(path: str) -> tp.Optional[Keys]:
+    import yamlpath
+    from yamlpath.enums import PathSegmentTypes
+
+    keys = []
+    for segment_type, segment in yamlpath.YAMLPath(path).unescaped:
+        if segment_type != PathSegmentTypes.KEY:
+            return None
+        keys.append(segment)
+
+    return tuple(keys)
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_spec():
+    import ruamel.yaml
+
+    # Same settings as the YAML plugin's writer
+    spec = ruamel.yaml.YAML()
+    spec.version = (1, 2)
+    spec.width = 80
+    spec.preserve_quotes = True
+    spec.default_flow_style = False
+    return spec
+
+
+def _signature(path: pathlib.Path) -> tp.Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _CachedExpDef:
+    """
+    Mixin over a plugin's ``ExpDef``; see the module docs.
+    """
+
+    # Set by the syntax mixins
+    _kROUNDTRIP_EXACT = False
+    _kSHARED = ("tree",)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._init_cache()
+
+    def _init_cache(self) -> None:
+        # ids of the containers in the tree which this definition owns, or None
+        # if it owns all of them.
+        self._owned = None
+        self._record = False
+
+    @classmethod
+    def _compile(cls, path: str) -> tp.Optional[Keys]:
+        raise NotImplementedError
+
+    @classmethod
+    def _join(cls, parent: str, tag: str) -> str:
+        raise NotImplementedError
+
+    def _dump(self, node: tp.Any, opath: pathlib.Path) -> None:
+        raise NotImplementedError
+
+    def _rebind(self) -> None:
+        """Update anything holding on to the root of the tree after it changes."""
+
+    def _shareable(self, node: dict) -> bool:
+        """Whether a node can be copied without changing what is written."""
+        return True
+
+    def _resolve(self, keys: Keys) -> tp.Optional[tp.Any]:
+        node = self.tree
+        for k in keys:
+            if not isinstance(node, dict) or k not in node:
+                return None
+            node = node[k]
+        return node
+
+    def _own(self, keys: Keys) -> dict:
+        """
+        Get the (dict) node at ``keys``, copying shared nodes along the way.
+        """
+        if self._owned is not None:
+            node = self.tree
+            path = [node]
+            for k in keys:
+                node = node[k]
+                path.append(node)
+
+            if not all(self._shareable(n) for n in path):
+                self._materialize()
+
+        if self._owned is None:
+            return self._resolve(keys)
+
+        if id(self.tree) not in self._owned:
+            self.tree = copy.copy(self.tree)
+            self._owned.add(id(self.tree))
+            self._rebind()
+
+        node = self.tree
+        for k in keys:
+            child = node[k]
+            if id(child) not in self._owned:
+                child = copy.copy(child)
+                node[k] = child
+                self._owned.add(id(child))
+            node = child
+
+        return node
+
+    def _materialize(self) -> None:
+        """Take a private copy of the whole tree, before the plugin changes it."""
+        if self._owned is not None:
+            self.tree = copy.deepcopy(self.tree)
+            self._owned = None
+            self._rebind()
+
+    def __deepcopy__(self, memo: dict) -> "_CachedExpDef":
+        clone = self.__class__.__new__(self.__class__)
+        memo[id(self)] = clone
+
+        for k, v in vars(self).items():
+            if k in self._kSHARED or isinstance(v, logging.Logger):
+                setattr(clone, k, v)
+            else:
+                setattr(clone, k, copy.deepcopy(v, memo))
+
+        # Neither side owns anything anymore
+        self._owned = set()
+        clone._owned = set()
+        clone._rebind()
+        return clone
+
+    def attr_change(
+        self,
+        path: str,
+        attr: str,
+        value: tp.Union[str, int, float],
+        noprint: bool = False,
+    ) -> bool:
+        keys = self._compile(path)
+        node = self._resolve(keys) if keys is not None else None
+
+        # Anything other than changing an existing attribute of a single node
+        # (errors, multiple matches, ...) is left to the plugin.
+        if (
+            not isinstance(node, dict)
+            or attr not in node
+            or isinstance(node[attr], (list, dict))
+        ):
+            self._materialize()
+            return super().attr_change(path, attr, value, noprint)
+
+        self._own(keys)[attr] = value
+        self.logger.trace("Modify attr: '%s/%s' = '%s'", path, attr, value)
+
+        self.attr_chgs.add(definition.AttrChange(path, attr, value))
+        return True
+
+    def attr_add(self, *args, **kwargs) -> bool:
+        self._materialize()
+        return super().attr_add(*args, **kwargs)
+
+    def element_change(self, *args, **kwargs) -> bool:
+        self._materialize()
+        return super().element_change(*args, **kwargs)
+
+    def element_remove(self, *args, **kwargs) -> bool:
+        self._materialize()
+        return super().element_remove(*args, **kwargs)
+
+    def element_remove_all(self, *args, **kwargs) -> bool:
+        self._materialize()
+        return super().element_remove_all(*args, **kwargs)
+
+    def element_add(self, *args, **kwargs) -> bool:
+        self._materialize()
+        return super().element_add(*args, **kwargs)
+
+    def flatten(self, keys: tp.List[str]) -> None:
+        self._materialize()
+        super().flatten(keys)
+
+    def write(self, base_opath: pathlib.Path) -> None:
+        if self.write_config is None:
+            raise ValueError("Can't write without write config")
+
+        plan = []
+        for config in self.write_config.values:
+            if config["src_parent"] is None:
+                src_root = config["src_tag"]
+            else:
+                src_root = self._join(config["src_parent"], config["src_tag"])
+
+            keys = self._compile(src_root)
+            node = self._resolve(keys) if keys is not None else None
+            if node is None:
+                super().write(base_opath)
+                return
+
+            if "opath_leaf" in config and config["opath_leaf"] is not None:
+                opath = base_opath.with_name(base_opath.name + config["opath_leaf"])
+            else:
+                opath = base_opath
+
+            plan.append((keys, node, opath))
+
+        for keys, node, opath in plan:
+            self._dump(node, opath)
+
+            if self._record and self._kROUNDTRIP_EXACT and keys == ():
+                _TEMPLATES[str(opath)] = (_signature(opath), copy.deepcopy(self))
+
+
+class _JSONExpDef(_CachedExpDef):
+    _kROUNDTRIP_EXACT = True
+
+    @classmethod
+    def _compile(cls, path: str) -> tp.Optional[Keys]:
+        return _compile_jsonpath(path)
+
+    @classmethod
+    def _join(cls, parent: str, tag: str) -> str:
+        return f"{parent}.{tag}"
+
+    def _dump(self, node: tp.Any, opath: pathlib.Path) -> None:
+        with utils.utf8open(opath, "w") as f:
+            json.dump(node, f, indent=2)
+
+
+class _YAMLExpDef(_CachedExpDef):
+    # The processor is rebound to the clone's tree
+    _kSHARED = ("tree", "processor", "log", "yaml_spec")
+
+    @classmethod
+    def _compile(cls, path: str) -> tp.Optional[Keys]:
+        return _compile_yamlpath(path)
+
+    @classmethod
+    def _join(cls, parent: str, tag: str) -> str:
+        return f"{parent}/{tag}"
+
+    def _dump(self, node: tp.Any, opath: pathlib.Path) -> None:
+        with utils.utf8open(opath, "w") as f:
+            _yaml_spec().dump(node, f)
+
+    def _rebind(self) -> None:
+        import yamlpath
+
+        self.processor = yamlpath.Processor(self.log, self.tree)
+
+    def _shareable(self, node: dict) -> bool:
+        # Anchored/merged nodes may appear in the output more than once, so
+        # copying them on one path only would change the output.
+        anchor = getattr(node, "anchor", None)
+        return not getattr(node, "merge", None) and (
+            anchor is None or anchor.value is None
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def cached_class(expdef: str) -> type:
+    """
+    Get the cached ``ExpDef`` class for an ``--expdef`` plugin.
+
+    Plugins other than JSON and YAML get their own ``ExpDef`` back unchanged.
+    """
+    module = pm.pipeline.get_plugin_module(expdef)
+    mixin = {"$": _JSONExpDef, "/": _YAMLExpDef}.get(module.root_querypath())
+
+    if mixin is None:
+        return module.ExpDef
+
+    return type("ExpDef", (mixin, module.ExpDef), {})
+
+
+def from_state(expdef: str, state: tp.Dict[str, tp.Any]) -> definition.BaseExpDef:
+    """
+    Rebuild a definition from its attributes, e.g., after unpickling them.
+    """
+    cls = cached_class(expdef)
+    exp_def = cls.__new__(cls)
+    vars(exp_def).update(state)
+
+    if isinstance(exp_def, _CachedExpDef):
+        # Whatever it owned before is a fresh copy now
+        exp_def._owned = None
+        exp_def._record = False
+        exp_def._rebind()
+
+    return exp_def
+
+
+def adopt(exp_def: definition.BaseExpDef) -> definition.BaseExpDef:
+    """
+    Convert a definition made by an ``--expdef`` plugin to its cached class.
+
+    Whole templates written by it (or its clones) are remembered for
+    :func:`load`.
+    """
+    for name, plugin in pm.pipeline.loaded_plugins().items():
+        if getattr(plugin["module"], "ExpDef", None) is type(exp_def):
+            exp_def = from_state(name, vars(exp_def))
+            break
+
+    if isinstance(exp_def, _CachedExpDef):
+        exp_def._record = True
+
+    return exp_def
+
+
+def load(
+    expdef: str,
+    input_fpath: pathlib.Path,
+    write_config: tp.Optional[definition.WriterConfig] = None,
+) -> definition.BaseExpDef:
+    """
+    Get the definition for a template file.
+
+    If the file is a whole template written earlier in this stage 1 and is
+    unchanged since, it's a clone of the definition which wrote it. Otherwise,
+    the file is parsed.
+    """
+    entry = _TEMPLATES.pop(str(input_fpath), None)
+
+    if entry is not None and entry[0] == _signature(input_fpath):
+        _, exp_def = entry
+        exp_def.input_fpath = input_fpath
+        exp_def.write_config = write_config
+        exp_def.element_adds = definition.ElementAddList()
+        exp_def.attr_chgs = definition.AttrChangeSet()
+        exp_def._record = False
+        return exp_def
+
+    return cached_class(expdef)(input_fpath=input_fpath, write_config=write_config)
+
+
+__all__ = ["adopt", "cached_class", "from_state", "load"]
@@ -0,0 +1,160 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Process-pool generation of experiment definitions in stage 1.
+
+SIERRA asks the project scenario generator for each experiment's definition in
+turn, and the engine's ``for_all_exp`` does the same work for each: parse the
+experiment's template, flatten it, apply ``--exp-setup`` and pickle the
+modifications. With ``--exp-gen-workers`` != 1, the first request instead
+submits ALL remaining experiments in the batch to a process pool, and each
+request after that just waits for its experiment's result. Results are always
+handed back in experiment order, and each experiment's definition is built
+exactly as it would be serially, so the generated files are identical.
+
+Workers are forked, so they inherit the plugins SIERRA has already loaded
+(they are not importable from scratch in a fresh interpreter). For the same
+reason, definitions come back from workers as their attributes, and are
+rebuilt in the parent as instances of the ``--expdef`` plugin's (cached)
+``ExpDef``.
+"""
+
+# Core packages
+import concurrent.futures as cf
+import logging
+import multiprocessing
+import os
+import pathlib
+import typing as tp
+
+# 3rd party packages
+from sierra.core.experiment import definition, spec
+from sierra.core import types
+
+# Project packages
+from plugins import expdefcache
+
+_logger = logging.getLogger(__name__)
+
+# Inherited by forked workers; everything needed to generate an experiment
+# other than its number, so only the number needs to be sent to a worker.
+_JOB = None
+
+# Parent only: the pool, and the outstanding experiments it is generating.
+_POOL = None
+_PENDING: tp.Dict[pathlib.Path, cf.Future] = {}
+
+GeneratorFunc = tp.Callable[
+    [spec.ExperimentSpec, str, types.Cmdopts, pathlib.Path], definition.BaseExpDef
+]
+
+
+def _generate(exp_num: int) -> tp.Dict[str, tp.Any]:
+    func, criteria, batch_input_root, template_leaf, controller, cmdopts = _JOB
+    exp_spec = spec.ExperimentSpec(criteria, batch_input_root, exp_num, cmdopts)
+    exp_def = func(
+        exp_spec, controller, cmdopts, exp_spec.exp_input_root / template_leaf
+    )
+
+    # Plugin classes can't be pickled by reference, but their state can.
+    return vars(exp_def)
+
+
+def _shutdown() -> None:
+    global _POOL
+
+    for future in _PENDING.values():
+        future.cancel()
+    _PENDING.clear()
+
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
+
+
+def _start(
+    func: GeneratorFunc,
+    exp_spec: spec.ExperimentSpec,
+    controller: str,
+    cmdopts: types.Cmdopts,
+    expdef_template_fpath: pathlib.Path,
+) -> None:
+    global _JOB, _POOL
+
+    _shutdown()
+
+    batch_input_root = exp_spec.exp_input_root.parent
+    exp_names = exp_spec.criteria.gen_exp_names()
+    n_workers = cmdopts["exp_gen_workers"] or os.cpu_count()
+
+    _JOB = (
+        func,
+        exp_spec.criteria,
+        batch_input_root,
+        expdef_template_fpath.name,
+        controller,
+        cmdopts,
+    )
+    _POOL = cf.ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=multiprocessing.get_context("fork")
+    )
+
+    _logger.info(
+        "Generating definitions for exp%s-exp%s with %s workers",
+        exp_spec.exp_num,
+        len(exp_names) - 1,
+        n_workers,
+    )
+    for exp_num in range(exp_spec.exp_num, len(exp_names)):
+        _PENDING[batch_input_root / exp_names[exp_num]] = _POOL.submit(
+            _generate, exp_num
+        )
+
+
+def for_all_exp(
+    func: GeneratorFunc,
+    exp_spec: spec.ExperimentSpec,
+    controller: str,
+    cmdopts: types.Cmdopts,
+    expdef_template_fpath: pathlib.Path,
+) -> definition.BaseExpDef:
+    """
+    Generate the definition for an experiment, possibly in a process pool.
+
+    Arguments:
+
+        func: The engine's ``for_all_exp``, which does the actual generation.
+
+        exp_spec: The spec for the experiment.
+
+        controller: The controller used for the experiment, as passed via
+                    ``--controller``.
+
+        cmdopts: Dictionary containing parsed cmdline options.
+
+        expdef_template_fpath: The path to the experiment's template.
+    """
+    if cmdopts["exp_gen_workers"] == 1:
+        return func(exp_spec, controller, cmdopts, expdef_template_fpath)
+
+    # SIERRA asks for experiments in order, so anything not already being
+    # generated is the start of a new batch.
+    if exp_spec.exp_input_root not in _PENDING:
+        _start(func, exp_spec, controller, cmdopts, expdef_template_fpath)
+
+    try:
+        state = _PENDING.pop(exp_spec.exp_input_root).result()
+    except BaseException:
+        _shutdown()
+        raise
+
+    if not _PENDING:
+        _shutdown()
+
+    return expdefcache.from_state(cmdopts["expdef"], state)
+
+
+__all__ = ["for_all_exp"]
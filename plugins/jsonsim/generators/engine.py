@@ -12,11 +12,9 @@ from sierra.core.experiment import definition
 from sierra.core import types
 import sierra.core.utils as scutils
 from sierra.core.experiment import spec
-from sierra.core import plugin as pm
 
 # Project packages
-
-
+from plugins import expdefcache
 from plugins.jsonsim.variables import exp_setup
 
 
@@ -55,13 +53,9 @@ def for_all_exp(
             }
         ]
     )
-    module = pm.pipeline.get_plugin_module(cmdopts["expdef"])
-
-    expdef = module.ExpDef(input_fpath=expdef_template_fpath, write_config=wr_config)
-
-    # Optional, only needed if your platform supports nested
-    # configuration files.
-    expdef.flatten(["pathstring1", "pathstring2"])
+    # Usually the template scaffolded for the experiment earlier in stage 1,
+    # so no need to parse it again.
+    expdef = expdefcache.load(cmdopts["expdef"], expdef_template_fpath, wr_config)
 
     setup = exp_setup.factory(cmdopts["exp_setup"])
     _, adds, chgs = scutils.apply_to_expdef(setup, expdef)
@@ -69,6 +63,10 @@ def for_all_exp(
     # Write setup info to file for later retrieval
     scutils.pickle_modifications(adds, chgs, spec.exp_def_fpath)
 
+    expdef.attr_change("$", "output_mode", cmdopts["output_mode"])
+    expdef.attr_change("$", "output_format", cmdopts["output_format"])
+    expdef.attr_change("$", "output_summary", cmdopts["output_summary"])
+
     return expdef
 
 
@@ -103,4 +101,5 @@ def for_single_exp_run(
         cmdopts: Dictionary containing parsed cmdline options.
     """
     expdef.attr_change("$", "output_root", str(run_output_path / "output"))
+    expdef.attr_change("$", "random_seed", random_seed)
     return expdef
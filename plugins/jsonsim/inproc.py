@@ -0,0 +1,295 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+In-process batched executor for JSONSIM runs.
+
+Running ``python3 jsonsim.py`` once per experimental run pays interpreter
+startup and the numpy/pandas imports every time, which for short runs costs
+more than the simulation itself. Instead, a long-lived server owns a pool of
+worker processes which each import the simulator ONCE and then execute many
+runs by calling :func:`jsonsim.run` directly.
+
+Each experimental run is submitted by a lightweight client (this script, which
+only imports stdlib modules) over a unix socket. The first client to find no
+server running starts one; the server exits on its own after being idle for a
+while, so no explicit teardown is needed.
+
+Usage::
+
+    inproc.py submit --socket S --jsonsim-path P --config C --distribution D
+    inproc.py serve --socket S --jsonsim-path P [--jobs N]
+    inproc.py shutdown --socket S
+"""
+
+# Core packages
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+
+# 3rd party packages
+
+# Project packages
+
+# Set by the worker initializer; the simulator module imported once per worker.
+_SIM = None
+
+_kConnectTimeout = 60.0
+_kIdleTimeout = 120.0
+_kSubmitAttempts = 3
+
+
+def _init_worker(jsonsim_path: str) -> None:
+    import importlib.util
+
+    global _SIM
+    spec = importlib.util.spec_from_file_location("jsonsim", jsonsim_path)
+    _SIM = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(_SIM)
+
+
+def _run_one(config_fpath: str, distribution: str) -> None:
+    with open(config_fpath, "r") as f:
+        config = json.load(f)
+
+    _SIM.run(config, distribution)
+
+
+def _request(sock_path: str, msg: dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(sock_path)
+        s.sendall((json.dumps(msg) + "\n").encode())
+        with s.makefile("r") as f:
+            line = f.readline()
+
+    # The server closes connections without replying while it shuts down
+    if not line.endswith("\n"):
+        raise ConnectionError(f"No reply from JSONSIM inproc server on {sock_path}")
+
+    return json.loads(line)
+
+
+def _spawn_server(args: argparse.Namespace) -> None:
+    # Serialize server startup between concurrent clients; whoever gets the
+    # lock first starts the server, everyone else just waits for the socket.
+    with open(f"{args.socket}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            _request(args.socket, {"op": "ping"})
+            return
+        except OSError:
+            pass
+
+        subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                "serve",
+                "--socket",
+                args.socket,
+                "--jsonsim-path",
+                args.jsonsim_path,
+                "--jobs",
+                str(args.jobs),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        deadline = time.monotonic() + _kConnectTimeout
+        while time.monotonic() < deadline:
+            try:
+                _request(args.socket, {"op": "ping"})
+                return
+            except OSError:
+                time.sleep(0.05)
+
+    raise RuntimeError(f"JSONSIM inproc server on {args.socket} did not start")
+
+
+def submit(args: argparse.Namespace) -> int:
+    msg = {
+        "op": "run",
+        "config": str(pathlib.Path(args.config).resolve()),
+        "distribution": args.distribution,
+    }
+    # No server, or one which went idle and is shutting down: start a new one.
+    # Runs only write their own outputs, so running one again is harmless.
+    for attempt in range(_kSubmitAttempts):
+        try:
+            reply = _request(args.socket, msg)
+            break
+        except OSError:
+            if attempt == _kSubmitAttempts - 1:
+                raise
+            _spawn_server(args)
+
+    if not reply["ok"]:
+        sys.stderr.write(reply["error"])
+        return 1
+
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    import concurrent.futures as cf
+    import multiprocessing
+    import socketserver
+    import threading
+    import traceback
+
+    # Clean up after a server which died without removing its socket.
+    if os.path.exists(args.socket):
+        try:
+            _request(args.socket, {"op": "ping"})
+            return 0
+        except OSError:
+            os.unlink(args.socket)
+
+    pool = cf.ProcessPoolExecutor(
+        max_workers=args.jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(args.jsonsim_path,),
+    )
+    state = {"active": 0, "last": time.monotonic(), "closing": False}
+    lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            msg = json.loads(self.rfile.readline())
+
+            # Closing without a reply sends clients to a new server; see submit().
+            with lock:
+                if state["closing"]:
+                    return
+
+                if msg["op"] == "run":
+                    state["active"] += 1
+                elif msg["op"] == "shutdown":
+                    state["closing"] = True
+
+            if msg["op"] == "ping":
+                reply = {"ok": True}
+            elif msg["op"] == "shutdown":
+                threading.Thread(target=self.server.shutdown).start()
+                reply = {"ok": True}
+            else:
+                try:
+                    pool.submit(_run_one, msg["config"], msg["distribution"]).result()
+                    reply = {"ok": True}
+                except Exception:
+                    reply = {"ok": False, "error": traceback.format_exc()}
+                finally:
+                    with lock:
+                        state["active"] -= 1
+                        state["last"] = time.monotonic()
+
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    def _reap_when_idle(server: Server) -> None:
+        while True:
+            time.sleep(1.0)
+            # Runs accepted after this are turned away, not lost on exit.
+            with lock:
+                idle = time.monotonic() - state["last"]
+                if state["active"] == 0 and idle > args.idle_timeout:
+                    state["closing"] = True
+                    break
+        server.shutdown()
+
+    # The lock file is left alone: clients may hold it (see _spawn_server()).
+    with Server(args.socket, Handler) as server:
+        ino = os.stat(args.socket).st_ino
+        threading.Thread(target=_reap_when_idle, args=(server,), daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            # A new server may already have replaced this one while it was
+            # closing; its socket isn't ours to remove.
+            with contextlib.suppress(FileNotFoundError):
+                if os.stat(args.socket).st_ino == ino:
+                    os.unlink(args.socket)
+            pool.shutdown()
+
+    return 0
+
+
+def shutdown(args: argparse.Namespace) -> int:
+    try:
+        _request(args.socket, {"op": "shutdown"})
+    except OSError:
+        pass
+    return 0
+
+
+def socket_path(batch_input_root: pathlib.Path) -> str:
+    """
+    Get the server socket for a batch.
+
+    Derived from the batch input root so that command generation in stage 1 and
+    the runs in stage 2 agree on it without any shared state. Kept short and
+    under the temp dir, since unix socket paths are limited to ~100 chars.
+    """
+    import hashlib
+    import tempfile
+
+    digest = hashlib.sha1(str(batch_input_root).encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"jsonsim-inproc-{digest}.sock")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="In-process batched executor for JSONSIM runs."
+    )
+    sub = parser.add_subparsers(dest="op", required=True)
+
+    for op in ["submit", "serve", "shutdown"]:
+        p = sub.add_parser(op)
+        p.add_argument("--socket", required=True, help="Server socket path.")
+
+        if op == "shutdown":
+            continue
+
+        p.add_argument("--jsonsim-path", required=True, help="Path to jsonsim.py.")
+        p.add_argument(
+            "--jobs",
+            type=int,
+            default=os.cpu_count(),
+            help="# of worker processes in the server pool.",
+        )
+
+    submit_p = sub.choices["submit"]
+    submit_p.add_argument("--config", required=True, help="Run configuration file.")
+    submit_p.add_argument(
+        "--distribution", required=True, help="Distribution of generated data."
+    )
+
+    serve_p = sub.choices["serve"]
+    serve_p.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=_kIdleTimeout,
+        help="Seconds without any runs before the server exits.",
+    )
+
+    args = parser.parse_args()
+    return {"submit": submit, "serve": serve, "shutdown": shutdown}[args.op](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
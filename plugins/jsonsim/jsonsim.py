@@ -6,8 +6,12 @@
 
 # Core packages
 import argparse
+import fcntl
 import json
+import os
 import pathlib
+import shutil
+import typing as tp
 
 # 3rd party packages
 import pandas as pd
@@ -15,6 +19,21 @@ import numpy as np
 
 # Project packages
 
+# File extension for each supported output format.
+_kOUTPUT_EXTS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Suffix of the summary stats sidecar written next to each output, with
+# --output-summary; output1D.csv -> output1D.summary.json.
+_kSUMMARY_SUFFIX = ".summary.json"
+
+# Linux ioctl to share a file's extents with another (a reflink) on filesystems
+# which support it (btrfs, XFS, ...).
+_kFICLONE = 0x40049409
+
+# Grid 2D data is generated on if the configuration doesn't set one (e.g., the
+# -1 placeholders in the template); the same default as ``--exp-setup``.
+_kDEFAULT_GRID = (8, 6)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -26,35 +45,17 @@ def main():
     args = parser.parse_args()
 
     config = json.load(open(args.config, "r"))
+    run(config, args.distribution)
 
-    # Generate seeded random 1D data
-    rng = np.random.RandomState(42)
-    if args.distribution == "gaussian":
-        data_1D = rng.normal(
-            loc=0, scale=0.5, size=(int(config["exp_setup"]["n_datapoints"]), 5)
-        )
-    elif args.distribution == "binomial":
-        data_1D = rng.binomial(
-            n=int(config["exp_setup"]["n_datapoints"]) * 5,
-            p=0.3,
-            size=(int(config["exp_setup"]["n_datapoints"]), 5),
-        )
-
-    df1D = pd.DataFrame(data_1D, columns=[f"col{i}" for i in range(0, 5)])
-
-    data2D = []
-    for i in range(0, 8):
-        for j in range(0, 6):
-            data2D.append(
-                {
-                    "x": i,
-                    "y": j,
-                    "z": rng.rand(1)[0],
-                }
-            )
 
-    df2D = pd.DataFrame(data2D)
+def run(config: dict, distribution: str) -> None:
+    """
+    Run a single simulation from an already-loaded configuration.
 
+    :func:`main` is a thin cmdline wrapper around this; the ``inproc`` executor
+    imports this module once per worker and calls it directly for many runs, so
+    both paths produce identical outputs.
+    """
     # Output to file. Semicolon separate is currently required by SIERRA.
     root = pathlib.Path(config["output_root"])
     subdir1 = root / "subdir1/subdir2"
@@ -64,12 +65,319 @@ def main():
     subdir1.mkdir(parents=True, exist_ok=True)
     subdir2.mkdir(parents=True, exist_ok=True)
 
-    df1D.to_csv(root / "output1D.csv", index=False)
-    df1D.to_csv(subdir1 / "output1D.csv", index=False)
-    df1D.to_csv(subdir2 / "output1D.csv", index=False)
-    df2D.to_csv(root / "output2D.csv", index=False)
-    df2D.to_csv(subdir1 / "output2D.csv", index=False)
-    df2D.to_csv(subdir2 / "output2D.csv", index=False)
+    mode = config["output_mode"]
+    fmt = config["output_format"]
+    ext = _kOUTPUT_EXTS[fmt]
+
+    # Independent random streams for the 1D and 2D data, derived from the
+    # per-run seed, so that neither depends on how much of the other is drawn.
+    rng1D, rng2D = [
+        np.random.default_rng(s)
+        for s in np.random.SeedSequence(int(config["random_seed"])).spawn(2)
+    ]
+
+    # Generate random 1D data, all at once or in chunks to bound memory
+    # usage. Since the chunks are drawn from the same generator in order, both
+    # give identical outputs.
+    n_datapoints = int(config["exp_setup"]["n_datapoints"])
+    chunk_size = int(config["exp_setup"]["chunk_size"])
+    paths1D = [d / f"output1D{ext}" for d in [root, subdir1, subdir2]]
+    summary1D = Summary() if config["output_summary"] else None
+
+    if 0 < chunk_size < n_datapoints:
+        chunks = gen_output1D(rng1D, distribution, n_datapoints, chunk_size)
+        if summary1D:
+            chunks = summary1D.tee(chunks)
+
+        write_replicated_chunks(chunks, paths1D, mode, fmt)
+    else:
+        (df1D,) = gen_output1D(rng1D, distribution, n_datapoints, max(n_datapoints, 1))
+        if summary1D:
+            summary1D.update(df1D)
+
+        write_replicated(df1D, paths1D, mode, fmt)
+
+    write_summaries(summary1D, paths1D)
+
+    n_x = int(config["exp_setup"].get("grid_x", -1))
+    n_y = int(config["exp_setup"].get("grid_y", -1))
+    if n_x < 0 or n_y < 0:
+        n_x, n_y = _kDEFAULT_GRID
+
+    df2D = gen_output2D(rng2D, n_x, n_y)
+    paths2D = [d / f"output2D{ext}" for d in [root, subdir1, subdir2]]
+    summary2D = Summary() if config["output_summary"] else None
+    if summary2D:
+        summary2D.update(df2D)
+
+    write_replicated(df2D, paths2D, mode, fmt)
+    write_summaries(summary2D, paths2D)
+
+
+def write_replicated(
+    df: pd.DataFrame, paths: list[pathlib.Path], mode: str, fmt: str
+) -> None:
+    """
+    Write the same frame to each of ``paths``.
+
+    With ``copy``, the frame is serialized to each path separately. With
+    ``link``, it is serialized once and the remaining paths are hardlinked to
+    the first, falling back to a reflink and then a plain buffered copy if the
+    filesystem doesn't support that. Either way all paths end up with identical
+    contents.
+    """
+    if mode == "copy":
+        for path in paths:
+            write_df(df, path, fmt)
+        return
+
+    write_df(df, paths[0], fmt)
+    for path in paths[1:]:
+        _link_or_copy(paths[0], path)
+
+
+def write_replicated_chunks(
+    chunks: tp.Iterable[pd.DataFrame],
+    paths: list[pathlib.Path],
+    mode: str,
+    fmt: str,
+) -> None:
+    """
+    Like :func:`write_replicated`, but for a frame which arrives in chunks.
+
+    Each chunk is appended to the output(s) as it arrives, so only one chunk is
+    ever in memory at a time. The resulting files contain the same data as
+    writing the concatenated chunks with :func:`write_replicated`.
+    """
+    targets = paths if mode == "copy" else paths[:1]
+    writers = [_ChunkWriter(path, fmt) for path in targets]
+
+    try:
+        for df in chunks:
+            for writer in writers:
+                writer.write(df)
+    finally:
+        for writer in writers:
+            writer.close()
+
+    for path in paths[len(targets) :]:
+        _link_or_copy(paths[0], path)
+
+
+class _ChunkWriter:
+    """
+    Incrementally write a frame to a single file, one chunk at a time.
+    """
+
+    def __init__(self, path: pathlib.Path, fmt: str) -> None:
+        self.path = path
+        self.fmt = fmt
+        self.writer = None
+        self.started = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        # Outputs from a previous run with --output-mode=link may share an inode
+        # with other outputs, which appending would then also modify.
+        if not self.started:
+            self.path.unlink(missing_ok=True)
+
+        if self.fmt == "csv":
+            df.to_csv(
+                self.path,
+                index=False,
+                header=not self.started,
+                mode="a" if self.started else "w",
+            )
+        elif self.fmt in ("parquet", "arrow"):
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = self._open_arrow(table.schema)
+            self.writer.write_table(table)
+        else:
+            raise ValueError(f"Unknown output format '{self.fmt}'")
+
+        self.started = True
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+    def _open_arrow(self, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.fmt == "parquet":
+            return pq.ParquetWriter(self.path, schema, compression="zstd")
+
+        return pa.ipc.new_file(
+            self.path, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+        )
+
+
+def write_df(df: pd.DataFrame, path: pathlib.Path, fmt: str) -> None:
+    """
+    Write a frame to ``path`` in the given output format.
+
+    ``parquet`` and ``arrow`` (Arrow IPC) outputs are zstd compressed; both need
+    ``pyarrow``.
+    """
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    elif fmt == "arrow":
+        df.to_feather(path, compression="zstd")
+    else:
+        raise ValueError(f"Unknown output format '{fmt}'")
+
+
+class Summary:
+    """
+    Per-column summary stats of a frame, which may arrive in chunks.
+
+    For each numeric column: the first and last values (what inter-experiment
+    summary line graphs and heatmaps use, via their ``index``), min, max, mean
+    and (sample) standard deviation. Means and standard deviations are merged
+    across chunks with Chan et al.'s parallel algorithm, so they only depend
+    on the chunk size up to rounding.
+    """
+
+    def __init__(self) -> None:
+        self.n_rows = 0
+        self.cols = {}  # type: tp.Dict[str, tp.Dict[str, tp.Any]]
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.n_rows += len(df)
+        if len(df) == 0:
+            return
+
+        for col in df.select_dtypes("number").columns:
+            x = df[col].to_numpy()
+            n_b = len(x)
+            mean_b = float(x.mean())
+            m2_b = float(((x - mean_b) ** 2).sum())
+
+            stats = self.cols.get(col)
+            if stats is None:
+                self.cols[col] = {
+                    "first": x[0].item(),
+                    "last": x[-1].item(),
+                    "min": x.min().item(),
+                    "max": x.max().item(),
+                    "n": n_b,
+                    "mean": mean_b,
+                    "m2": m2_b,
+                }
+                continue
+
+            n_a = stats["n"]
+            delta = mean_b - stats["mean"]
+            stats["n"] = n_a + n_b
+            stats["mean"] += delta * n_b / stats["n"]
+            stats["m2"] += m2_b + delta**2 * n_a * n_b / stats["n"]
+            stats["last"] = x[-1].item()
+            stats["min"] = min(stats["min"], x.min().item())
+            stats["max"] = max(stats["max"], x.max().item())
+
+    def tee(self, chunks: tp.Iterable[pd.DataFrame]) -> tp.Iterator[pd.DataFrame]:
+        """
+        Summarize each chunk on its way through.
+        """
+        for df in chunks:
+            self.update(df)
+            yield df
+
+    def to_dict(self) -> dict:
+        return {
+            "n_rows": self.n_rows,
+            "cols": {
+                col: {
+                    "first": s["first"],
+                    "last": s["last"],
+                    "min": s["min"],
+                    "max": s["max"],
+                    "mean": s["mean"],
+                    "std": (s["m2"] / (s["n"] - 1)) ** 0.5 if s["n"] > 1 else None,
+                }
+                for col, s in self.cols.items()
+            },
+        }
+
+
+def write_summaries(summary: tp.Optional[Summary], paths: list[pathlib.Path]) -> None:
+    """
+    Write the summary sidecar for each of ``paths``.
+
+    Without a summary, stale sidecars from a previous run into the same output
+    directory are removed instead, so they never describe different data.
+    """
+    for path in paths:
+        sidecar = path.with_suffix(_kSUMMARY_SUFFIX)
+        if summary is None:
+            sidecar.unlink(missing_ok=True)
+            continue
+
+        with open(sidecar, "w") as f:
+            json.dump(summary.to_dict(), f)
+
+
+def _link_or_copy(src: pathlib.Path, dest: pathlib.Path) -> None:
+    # Re-running into an existing output directory is fine for write_df(), but
+    # not for os.link().
+    dest.unlink(missing_ok=True)
+
+    try:
+        os.link(src, dest)
+        return
+    except OSError:
+        pass
+
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), _kFICLONE, s.fileno())
+        return
+    except OSError:
+        pass
+
+    shutil.copyfile(src, dest)
+
+
+def gen_output1D(
+    rng: np.random.Generator, distribution: str, n_datapoints: int, chunk_size: int
+) -> tp.Iterator[pd.DataFrame]:
+    """
+    Generate ``n_datapoints`` rows of random 1D data, ``chunk_size`` at a time.
+
+    Each chunk continues drawing from ``rng`` where the last one left off, so
+    the concatenated chunks are the same regardless of ``chunk_size``.
+    """
+    columns = [f"col{i}" for i in range(0, 5)]
+
+    for start in range(0, max(n_datapoints, 1), chunk_size):
+        size = (min(chunk_size, n_datapoints - start), 5)
+
+        if distribution == "gaussian":
+            data_1D = rng.normal(loc=0, scale=0.5, size=size)
+        elif distribution == "binomial":
+            data_1D = rng.binomial(n=n_datapoints * 5, p=0.3, size=size)
+        else:
+            raise ValueError(f"Unknown distribution '{distribution}'")
+
+        yield pd.DataFrame(data_1D, columns=columns)
+
+
+def gen_output2D(rng: np.random.Generator, n_x: int, n_y: int) -> pd.DataFrame:
+    """
+    Generate random 2D data on an ``n_x`` by ``n_y`` grid.
+
+    All cells are drawn in a single call, in the same x-major order they would
+    be drawn one at a time, so the output for a given seed does not depend on
+    how it is generated.
+    """
+    x, y = np.meshgrid(np.arange(n_x), np.arange(n_y), indexing="ij")
+    return pd.DataFrame({"x": x.ravel(), "y": y.ravel(), "z": rng.random(n_x * n_y)})
 
 
 if __name__ == "__main__":
@@ -8,8 +8,9 @@
 import typing as tp
 import argparse
 import logging
+import math
 import pathlib
-import psutil
+import os
 
 # 3rd party packages
 import implements
@@ -18,12 +19,38 @@ import implements
 from sierra.core.experiment import bindings, definition
 from sierra.core.variables import batch_criteria as bc
 from sierra.core import types
-from sierra.plugins.execenv import hpc
-from sierra.plugins.execenv import prefectserver
 from plugins.jsonsim import cmdline
+from plugins import asynclaunch
+from plugins.collate import pipelined
+from plugins.collate import compacted
+from plugins import expdefcache
+from plugins import runcache
+from plugins import runprof
+from plugins.jsonsim import inproc
+from plugins.jsonsim.variables import exp_setup
 
 _logger = logging.getLogger(__name__)
 
+# Per-run peak memory model, calibrated against the max RSS of JSONSIM runs:
+# interpreter + numpy/pandas/pyarrow, plus the 1D rows held in memory at once,
+# plus the 2D grid. Deliberately on the high side.
+_kRUN_MEM_BASE = 160 * 1024**2
+_kRUN_MEM_PER_ROW1D = 80
+_kRUN_MEM_PER_CELL2D = 64
+
+# Per-run duration model, calibrated against the wall time of JSONSIM runs
+# writing CSV: interpreter + numpy/pandas startup (with --exec-mode=inproc,
+# just the client submitting the run), plus generating/writing the 1D rows.
+_kRUN_TIME_STARTUP = 0.6
+_kRUN_TIME_STARTUP_INPROC = 0.05
+_kRUN_TIME_PER_ROW1D = 30e-6
+
+# Time to start GNU parallel for an experiment with per-exp parallelism.
+_kEXP_LAUNCH_TIME = 0.3
+
+# The most extra time --exec-paradigm=auto will accept to run per-exp.
+_kPER_EXP_MAX_OVERHEAD = 0.05
+
 
 @implements.implements(bindings.IExpShellCmdsGenerator)
 class ExpShellCmdsGenerator:
@@ -59,18 +86,81 @@ class ExpRunShellCmdsGenerator:
     ) -> None:
         self.executable_path = cmdopts["jsonsim_path"]
         self.gen_dist = cmdopts["gen_dist"]
+        self.exec_mode = cmdopts["exec_mode"]
+        self.profile_runs = cmdopts["profile_runs"]
+        self.run_cache_dir = cmdopts["run_cache_dir"]
+        if self.run_cache_dir:
+            # Runs don't necessarily execute from the cwd SIERRA was invoked in
+            self.run_cache_dir = pathlib.Path(self.run_cache_dir).resolve()
+        self.run_cache_size = cmdopts["run_cache_size"]
+        self.n_runs = cmdopts["n_runs"]
+
+        self.exec_collate = cmdopts["exec_collate"]
+        if self.exec_collate:
+            self.collate_args = (
+                f"--project-config-root {cmdopts['project_config_root']} "
+                f"--storage {cmdopts['storage']} "
+                f"--df-homogenize {cmdopts['df_homogenize']} "
+                f"--retain {cmdopts['exec_collate_retain']}"
+            )
 
-        pass
+        if self.exec_mode == "inproc":
+            self.inproc_jobs = cmdopts["exec_jobs_per_node"] or os.cpu_count()
+        elif self.exec_mode == "async":
+            self.async_jobs = cmdopts["exec_jobs_per_node"] or os.cpu_count()
 
     def pre_run_cmds(
         self, host: str, input_fpath: pathlib.Path, run_num: int
     ) -> list[types.ShellCmdSpec]:
-        return []
+        if not self.profile_runs:
+            return []
+
+        # pre/exec/post cmds for a run all end up on the same line in the
+        # cmdfile, so this is visible to the exec and post cmds.
+        return [
+            types.ShellCmdSpec(
+                cmd=f"export {runprof.kSTAMP_ENV}={input_fpath}.runprof;",
+                shell=True,
+                wait=True,
+            )
+        ]
 
     def exec_run_cmds(
         self, host: str, input_fpath: pathlib.Path, run_num: int
     ) -> list[types.ShellCmdSpec]:
-        cmd = f"python3 {self.executable_path} --config {input_fpath}.json --distribution={self.gen_dist}"
+        if self.exec_mode == "async":
+            # One launcher per experiment runs everything, so only the first
+            # run gets a command; SIERRA skips cmdfile lines for the others.
+            if run_num != 0:
+                return []
+
+            exp_input_root = input_fpath.parent
+            log_dir = exp_input_root.parent.parent / "scratch" / exp_input_root.name
+            cmd = (
+                f"python3 {asynclaunch.__file__} "
+                f"--jobs {self.async_jobs} "
+                f"--n-runs {self.n_runs} "
+                f"--input-stem {str(input_fpath)[: -len('_run0')]} "
+                f"--log-dir {log_dir} -- {self._run_cmd(asynclaunch.kINPUT)}"
+            )
+            if self.exec_collate:
+                # <batchroot>/exp-inputs/<exp> -> <batchroot>/exp-outputs/<exp>
+                exp_output_root = (
+                    exp_input_root.parent.parent / "exp-outputs" / exp_input_root.name
+                )
+                cmd += (
+                    f"; python3 {pipelined.__file__} exp-done --status $? "
+                    f"--exp-output-root {exp_output_root} {self.collate_args}"
+                )
+        else:
+            cmd = self._run_cmd(str(input_fpath))
+
+        if self.profile_runs:
+            cmd = f"python3 {runprof.__file__} exec -- {cmd};"
+        elif self.exec_collate and self.exec_mode != "async":
+            # So the post-run cmd can pick up the exit status
+            cmd += ";"
+
         return [
             types.ShellCmdSpec(
                 cmd=cmd,
@@ -79,10 +169,62 @@ class ExpRunShellCmdsGenerator:
             )
         ]
 
+    def _run_cmd(self, input_fpath: str) -> str:
+        if self.exec_mode == "inproc":
+            # One server per batch (input files are in <batchroot>/exp-inputs/<exp>),
+            # shared by all experiments, so we don't end up with a pool of
+            # mostly idle workers per experiment.
+            socket = inproc.socket_path(pathlib.Path(input_fpath).parent.parent)
+            cmd = (
+                f"python3 {inproc.__file__} submit "
+                f"--socket {socket} "
+                f"--jsonsim-path {self.executable_path} "
+                f"--jobs {self.inproc_jobs} "
+                f"--config {input_fpath}.json --distribution={self.gen_dist}"
+            )
+        else:
+            cmd = f"python3 {self.executable_path} --config {input_fpath}.json --distribution={self.gen_dist}"
+
+        if self.run_cache_dir:
+            cmd = (
+                f"python3 {runcache.__file__} exec "
+                f"--cache-dir {self.run_cache_dir} "
+                f"--max-size-mib {self.run_cache_size} "
+                f"--config {input_fpath}.json "
+                f"--source {self.executable_path} --flag distribution={self.gen_dist} -- {cmd}"
+            )
+
+        return cmd
+
     def post_run_cmds(
         self, host: str, run_output_root: pathlib.Path
     ) -> list[types.ShellCmdSpec]:
-        return []
+        cmds = []
+        if self.profile_runs:
+            cmds.append(
+                types.ShellCmdSpec(
+                    cmd=f"python3 {runprof.__file__} finish --output-root {run_output_root};",
+                    shell=True,
+                    wait=True,
+                )
+            )
+
+        # With async, the launcher collates once all runs are done instead.
+        if self.exec_collate and self.exec_mode != "async":
+            # After runprof, which exits with the run's status
+            cmds.append(
+                types.ShellCmdSpec(
+                    cmd=(
+                        f"python3 {pipelined.__file__} run-done --status $? "
+                        f"--run-output-root {run_output_root} "
+                        f"--n-runs {self.n_runs} {self.collate_args};"
+                    ),
+                    shell=True,
+                    wait=True,
+                )
+            )
+
+        return cmds
 
 
 @implements.implements(bindings.IExpConfigurer)
@@ -99,7 +241,25 @@ class ExpConfigurer:
         pass
 
     def parallelism_paradigm(self) -> str:
-        return "per-batch"
+        # Resolved from --exec-paradigm by cmdline_postparse_configure()
+        return self.cmdopts["exec_paradigm"]
+
+
+def expdef_flatten(exp_def: definition.BaseExpDef) -> definition.BaseExpDef:
+    """
+    Flatten ``--expdef-template`` once, before SIERRA scaffolds the batch from it.
+
+    Nested config file paths are resolved relative to the template itself,
+    rather than to each experiment's copy of it. Also switches stage 1 over to
+    the cached experiment definitions from :mod:`plugins.expdefcache`.
+    """
+    exp_def = expdefcache.adopt(exp_def)
+
+    # Optional, only needed if your platform supports nested
+    # configuration files.
+    exp_def.flatten(["pathstring1", "pathstring2"])
+    return exp_def
+
 
 def cmdline_postparse_configure(
     execenv: str, args: argparse.Namespace
@@ -122,24 +282,165 @@ def cmdline_postparse_configure(
     if not any(stage in args.pipeline for stage in [1, 2]):
         return args
 
+    if args.exec_mode == "async" and args.profile_runs:
+        raise ValueError("--profile-runs can't be used with --exec-mode=async")
+
     if execenv == "hpc.local":
-        return _configure_hpc_local(args)
+        args = _configure_hpc_local(args)
     elif execenv == "prefectserver.local":
-        return _configure_prefectserver_local(args)
-    elif execenv == "prefectserver.dockerremote":
-        return args
+        args = _configure_prefectserver_local(args)
+    elif execenv != "prefectserver.dockerremote":
+        _logger.warning(f"'{execenv}' unsupported on JSONSIM--may crash unexpectedly!")
 
-    _logger.warning(f"'{execenv}' unsupported on JSONSIM--may crash unexpectedly!")
+    args.exec_paradigm = _select_paradigm(args)
     return args
 
 
+def execenv_check(cmdopts: types.Cmdopts) -> None:
+    """
+    Check that stage 3 can read what stage 2 leaves behind.
+
+    Only plugins in :data:`plugins.collate.compacted.kREADERS` read raw outputs
+    compacted by ``--exec-collate-retain=compact``; the rest find nothing.
+    """
+    if not cmdopts["exec_collate"] or cmdopts["exec_collate_retain"] != "compact":
+        return
+
+    unread = [p for p in cmdopts["proc"] if p not in compacted.kREADERS]
+    if unread:
+        _logger.warning(
+            "--proc %s can't read raw outputs compacted by "
+            "--exec-collate-retain=compact; use %s in stage 3",
+            " ".join(unread),
+            " ".join(compacted.kREADERS),
+        )
+
+
+def _select_paradigm(args: argparse.Namespace) -> str:
+    """
+    Resolve ``--exec-paradigm`` to the parallelism paradigm for the batch.
+
+    For ``auto``, the time to run one experiment is modeled both ways.
+    ``per-batch`` packs runs from all experiments into the available slots, so
+    an experiment costs its share of the slots. ``per-exp`` also pays for
+    starting GNU parallel, and for slots idling until the last run in the
+    experiment finishes. ``per-exp`` is picked if it is at most
+    ``_kPER_EXP_MAX_OVERHEAD`` slower, since then experiments are complete as
+    soon as they finish, rather than all at the end.
+    """
+    if args.exec_mode == "async":
+        # The async launcher for each experiment does its own parallelism
+        if args.exec_paradigm == "per-batch":
+            raise ValueError(
+                "--exec-paradigm=per-batch can't be used with --exec-mode=async"
+            )
+
+        if args.exec_paradigm == "auto":
+            _logger.info("Selected per-exp parallelism: required by --exec-mode=async")
+
+        return "per-exp"
+
+    if args.exec_paradigm is None:
+        return "per-batch"
+    elif args.exec_paradigm != "auto":
+        return args.exec_paradigm
+
+    run_time = _estimate_run_time(args)
+    n_slots = args.exec_jobs_per_node or min(args.n_runs, _max_parallel_runs(args))
+
+    per_batch = args.n_runs / n_slots * run_time
+    per_exp = math.ceil(args.n_runs / n_slots) * run_time + _kEXP_LAUNCH_TIME
+    overhead = per_exp / per_batch - 1
+    paradigm = "per-exp" if overhead <= _kPER_EXP_MAX_OVERHEAD else "per-batch"
+
+    _logger.info(
+        "Selected %s parallelism: est. %.2fs/run, %s runs/exp on %s slots; "
+        "per-exp est. %.0f%% slower than per-batch (max %.0f%%)",
+        paradigm,
+        run_time,
+        args.n_runs,
+        n_slots,
+        overhead * 100,
+        _kPER_EXP_MAX_OVERHEAD * 100,
+    )
+    if args.exec_mode == "subprocess" and run_time < 2 * _kRUN_TIME_STARTUP:
+        _logger.info(
+            "Runs are mostly interpreter startup: --exec-mode=inproc/async "
+            "may be faster"
+        )
+
+    return paradigm
+
+
+def _estimate_run_mem(args: argparse.Namespace) -> int:
+    """
+    Estimate the peak memory in bytes of a single JSONSIM run from ``--exp-setup``.
+    """
+    setup = exp_setup.factory(args.exp_setup)
+
+    rows = setup.n_datapoints
+    if 0 < setup.chunk_size < rows:
+        rows = setup.chunk_size
+
+    return (
+        _kRUN_MEM_BASE
+        + rows * _kRUN_MEM_PER_ROW1D
+        + setup.grid_x * setup.grid_y * _kRUN_MEM_PER_CELL2D
+    )
+
+
+def _estimate_run_time(args: argparse.Namespace) -> float:
+    """
+    Estimate the wall time in seconds of a single JSONSIM run from ``--exp-setup``.
+    """
+    setup = exp_setup.factory(args.exp_setup)
+
+    if args.exec_mode == "inproc":
+        startup = _kRUN_TIME_STARTUP_INPROC
+    else:
+        startup = _kRUN_TIME_STARTUP
+
+    return startup + setup.n_datapoints * _kRUN_TIME_PER_ROW1D
+
+
+def _max_parallel_runs(args: argparse.Namespace) -> int:
+    """
+    Get the max # of runs which can execute in parallel on this node.
+
+    Each run needs a core and enough memory for its estimated peak usage;
+    whichever runs out first sets the limit.
+    """
+    # Only needed when generating commands, so not imported at module level.
+    import psutil
+
+    n_cores = int(psutil.cpu_count())
+    run_mem = _estimate_run_mem(args)
+    avail_mem = psutil.virtual_memory().available
+    n_mem = max(1, avail_mem // run_mem)
+
+    _logger.info(
+        "Estimated %.1f MiB/run with %.1f MiB available: memory allows %s "
+        "parallel runs, cores allow %s",
+        run_mem / 1024**2,
+        avail_mem / 1024**2,
+        n_mem,
+        n_cores,
+    )
+    if run_mem > avail_mem:
+        _logger.warning(
+            "A single run may not fit in available memory (see .C<rows> in --exp-setup)"
+        )
+
+    return min(n_cores, n_mem)
+
+
 def _configure_prefectserver_local(args: argparse.Namespace) -> argparse.Namespace:
     _logger.debug("Configuring for Prefect local execution")
 
     if args.exec_jobs_per_node is None:
-        parallel_jobs = int(psutil.cpu_count())
+        parallel_jobs = _max_parallel_runs(args)
 
-        # Make sure we don't oversubscribe cores
+        # Make sure we don't oversubscribe cores or memory
         args.exec_jobs_per_node = min(args.n_runs, parallel_jobs)
 
     _logger.debug("Allocated %s parallel runs/node", args.exec_jobs_per_node)
@@ -151,10 +452,10 @@ def _configure_hpc_local(args: argparse.Namespace) -> argparse.Namespace:
     _logger.debug("Configuring for HPC local execution")
 
     if args.exec_jobs_per_node is None:
-        parallel_jobs = int(psutil.cpu_count())
+        parallel_jobs = _max_parallel_runs(args)
 
-        # Make sure we don't oversubscribe cores--each simulation needs at
-        # least 1 core.
+        # Make sure we don't oversubscribe cores or memory--each simulation
+        # needs at least 1 core and its estimated peak memory.
         args.exec_jobs_per_node = min(args.n_runs, parallel_jobs)
 
     _logger.debug("Allocated %s parallel runs/node", args.exec_jobs_per_node)
@@ -6,6 +6,7 @@
 
 # Core packages
 import typing as tp
+import re
 
 # 3rd party packages
 import implements
@@ -29,11 +30,28 @@ class ExpSetup:
         n_datapoints: How many datapoints to capture during the experimental
                       run.
 
+        grid_x: X dimension of the grid 2D data is generated on.
+
+        grid_y: Y dimension of the grid 2D data is generated on.
+
+        chunk_size: Max # of datapoints to generate/write at once; 0 to do
+                    them all at once.
+
     """
 
-    def __init__(self, n_secs_per_run: int, n_datapoints: int) -> None:
+    def __init__(
+        self,
+        n_secs_per_run: int,
+        n_datapoints: int,
+        grid_x: int,
+        grid_y: int,
+        chunk_size: int,
+    ) -> None:
         self.n_secs_per_run = n_secs_per_run
         self.n_datapoints = n_datapoints
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.chunk_size = chunk_size
 
         self.element_chgs = None
 
@@ -42,6 +60,9 @@ class ExpSetup:
             self.element_chgs = definition.AttrChangeSet(
                 definition.AttrChange("$.exp_setup", "length", self.n_secs_per_run),
                 definition.AttrChange("$.exp_setup", "n_datapoints", self.n_datapoints),
+                definition.AttrChange("$.exp_setup", "grid_x", self.grid_x),
+                definition.AttrChange("$.exp_setup", "grid_y", self.grid_y),
+                definition.AttrChange("$.exp_setup", "chunk_size", self.chunk_size),
             )
 
         return [self.element_chgs]
@@ -59,11 +80,40 @@ class ExpSetup:
 def factory(arg: str) -> ExpSetup:
     """Create an :class:`ExpSetup` derived class from the command line definition.
 
+    In addition to what SIERRA understands, JSONSIM accepts the following
+    optional sections, e.g., ``exp_setup.T10.K5.N1000000.C100000.G64x48``:
+
+    - ``.N<n>`` - The # of datapoints to generate (50 if omitted).
+
+    - ``.C<rows>`` - Generate and write 1D data in chunks of at most this many
+      datapoints, to bound memory usage for large ``N`` (all at once if
+      omitted).
+
+    - ``.G<X>x<Y>`` - The size of the 2D data grid (8x6 if omitted).
+
     Arguments:
 
        arg: The value of ``--exp-setup``.
 
     """
+    grid_x, grid_y = 8, 6
+    res = re.search(r"\.G(\d+)x(\d+)", arg)
+    if res is not None:
+        grid_x, grid_y = int(res.group(1)), int(res.group(2))
+        arg = arg.replace(res.group(0), "")
+
+    n_datapoints = None
+    res = re.search(r"\.N(\d+)", arg)
+    if res is not None:
+        n_datapoints = int(res.group(1))
+        arg = arg.replace(res.group(0), "")
+
+    chunk_size = 0
+    res = re.search(r"\.C(\d+)", arg)
+    if res is not None:
+        chunk_size = int(res.group(1))
+        arg = arg.replace(res.group(0), "")
+
     attr = exp_setup.parse(
         arg,
         {
@@ -73,7 +123,12 @@ def factory(arg: str) -> ExpSetup:
         },
     )
 
-    return ExpSetup(attr["n_secs_per_run"], attr["n_datapoints"])
+    if n_datapoints is not None:
+        attr["n_datapoints"] = n_datapoints
+
+    return ExpSetup(
+        attr["n_secs_per_run"], attr["n_datapoints"], grid_x, grid_y, chunk_size
+    )
 
 
 __all__ = [
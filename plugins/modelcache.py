@@ -0,0 +1,168 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Memoization of inter-experiment model results.
+
+An inter-experiment model is normally recomputed every time it is run, even if
+nothing it depends on has changed (e.g., when re-running the pipeline to tweak
+graphs). :class:`CachedInterExpModel1D` implements ``IInterExpModel1D.run()``
+so that results are cached under ``<batch root>/models/cache``, keyed by:
+
+- The model's class.
+
+- Its parameters from ``models.yaml``.
+
+- The batch criteria, as given on the cmdline.
+
+- The contents of the collated files stage 3 produces for the graphs the
+  model targets in ``models.yaml``: for each target ``dest_stem`` in
+  ``graphs.yaml``, ``statistics/inter-exp/<exp>/<src_stem>-<col>.*`` (e.g.,
+  ``random-noise3-col2`` -> ``statistics/inter-exp/c1-exp0/subdir3/output1D-col2.csv``,
+  and so on for each experiment). Models run in stage 3, before stage 4
+  collates these into the ``statistics/inter-exp/<dest_stem>.*`` files graphs
+  are generated from, so those would be stale.
+
+If any of those change, so does the key, so stale results are never used; only
+the most recent entry for each model is kept. Results are stored as Parquet.
+Models are never cached without any of these files to key on.
+"""
+
+# Core packages
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import shutil
+
+# 3rd party packages
+import polars as pl
+import yaml
+
+# Project packages
+from sierra.core.variables import batch_criteria as bc
+from sierra.core import types, batchroot, config, utils
+
+_logger = logging.getLogger(__name__)
+
+
+class CachedInterExpModel1D:
+    """Base class for inter-experiment models whose results are cached.
+
+    Derived classes implement :meth:`run_uncached` instead of ``run()``, as
+    well as ``should_run()`` and ``__repr__()`` from ``IInterExpModel1D``.
+    """
+
+    def __init__(self, params: types.YAMLDict) -> None:
+        self.params = params
+
+    def run(
+        self,
+        criteria: bc.XVarBatchCriteria,
+        cmdopts: types.Cmdopts,
+        pathset: batchroot.PathSet,
+    ) -> list[pl.DataFrame]:
+        cache_root = pathset.model_root / "cache"
+        name = type(self).__name__
+        inputs = self._inputs(criteria, cmdopts, pathset)
+        if not inputs:
+            _logger.debug("No collated inputs for %s: not caching its results", self)
+            return self.run_uncached(criteria, cmdopts, pathset)
+
+        entry = cache_root / f"{name}-{self._key(criteria, inputs)}"
+
+        if entry.exists():
+            _logger.info("Using cached results for inter-experiment model %s", self)
+            n_dfs = len(list(entry.glob("*.parquet")))
+            return [pl.read_parquet(entry / f"{i}.parquet") for i in range(0, n_dfs)]
+
+        dfs = self.run_uncached(criteria, cmdopts, pathset)
+
+        # Write off to the side, so a partial entry is never used.
+        tmp = cache_root / f".{entry.name}.{os.getpid()}"
+        utils.dir_create_checked(tmp, exist_ok=True)
+        for i, df in enumerate(dfs):
+            df.write_parquet(tmp / f"{i}.parquet")
+
+        for stale in cache_root.glob(f"{name}-*"):
+            shutil.rmtree(stale, ignore_errors=True)
+
+        tmp.rename(entry)
+        return dfs
+
+    def run_uncached(
+        self,
+        criteria: bc.XVarBatchCriteria,
+        cmdopts: types.Cmdopts,
+        pathset: batchroot.PathSet,
+    ) -> list[pl.DataFrame]:
+        """Run the model; same semantics as ``IInterExpModel1D.run()``."""
+        raise NotImplementedError
+
+    def _key(self, criteria: bc.XVarBatchCriteria, inputs: dict[str, str]) -> str:
+        key = {
+            "model": f"{type(self).__module__}.{type(self).__qualname__}",
+            "params": self.params,
+            "criteria": criteria.name,
+            "inputs": inputs,
+        }
+        return hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+
+    def _inputs(
+        self,
+        criteria: bc.XVarBatchCriteria,
+        cmdopts: types.Cmdopts,
+        pathset: batchroot.PathSet,
+    ) -> dict[str, str]:
+        """
+        Get ``{path: sha256}`` for the collated files behind the model's targets.
+
+        Paths are relative to ``statistics/inter-exp``.
+        """
+        config_root = pathlib.Path(cmdopts["project_config_root"])
+        targets = self._targets(config_root)
+
+        with utils.utf8open(config_root / config.PROJECT_YAML.graphs) as f:
+            graphs_config = yaml.safe_load(f)
+
+        # Collated files are <src_stem>-<col>, for each graph generated from
+        # one of the targets.
+        sources = set()
+        for category in (graphs_config.get("inter-exp") or {}).values():
+            for graph in category:
+                if graph["dest_stem"] not in targets:
+                    continue
+
+                cols = graph["cols"] if "cols" in graph else [graph["col"]]
+                sources |= {f"{graph['src_stem']}-{col}" for col in cols}
+
+        inputs = {}
+        for exp in criteria.gen_exp_names():
+            for source in sorted(sources):
+                exp_root = pathset.stat_interexp_root / exp
+                for path in sorted(exp_root.glob(f"{source}.*")):
+                    rel = path.relative_to(pathset.stat_interexp_root).as_posix()
+                    with open(path, "rb") as f:
+                        inputs[rel] = hashlib.sha256(f.read()).hexdigest()
+
+        return inputs
+
+    def _targets(self, config_root: pathlib.Path) -> list[str]:
+        # SIERRA doesn't pass a model its targets, so look them up.
+        with utils.utf8open(config_root / config.PROJECT_YAML.models) as f:
+            models_config = yaml.safe_load(f)
+
+        return [
+            target
+            for conf in models_config.get("inter-exp") or []
+            if conf["name"].split(".")[-1] == type(self).__name__
+            for target in conf["targets"]
+        ]
+
+
+__all__ = ["CachedInterExpModel1D"]
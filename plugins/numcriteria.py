@@ -0,0 +1,135 @@
+# Copyright 2025 John Harwell, All rights reserved.
+#
+#  SPDX-License-Identifier: MIT
+
+"""Shared base for univariate batch criteria over a range of numeric levels.
+
+Such criteria are specified like <name>.<min>.<max>.C<Cardinality> on the
+cmdline; e.g., ``fuel.1.9.C5`` gives 5 experiments with levels 1,3,5,7,9.
+
+Levels are stored as a numpy array, and the changes/names for each experiment
+are only created when asked for, so that sweeps with very many levels don't
+cost memory or time up front. Subclasses just define the changes for a single
+level.
+"""
+
+# Core packages
+import typing as tp
+import pathlib
+import re
+import collections.abc
+
+# 3rd party packages
+import numpy as np
+
+# Project packages
+from sierra.core.experiment import definition
+from sierra.core import types
+import sierra.core.variables.batch_criteria as bc
+from sierra.core.graphs import bcbridge
+
+
+class _Lazy(collections.abc.Sequence):
+    """
+    A read-only sequence whose items are created from their index on access.
+    """
+
+    def __init__(self, n: int, item: tp.Callable[[int], tp.Any]) -> None:
+        self.n = n
+        self.item = item
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.item(j) for j in range(*i.indices(self.n))]
+
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(f"Index {i} out of range for {self.n} items")
+
+        return self.item(i)
+
+
+class NumericBatchCriteria(bc.UnivarBatchCriteria):
+    """A univariate range of numeric levels, one per experiment.
+
+    Attributes:
+        levels: The level for each experiment.
+    """
+
+    #: X label for graphs; set by subclasses.
+    kXLABEL = ""
+
+    def __init__(
+        self,
+        cli_arg: str,
+        main_config: types.YAMLDict,
+        batch_input_root: pathlib.Path,
+        levels: np.ndarray,
+    ) -> None:
+        bc.UnivarBatchCriteria.__init__(self, cli_arg, main_config, batch_input_root)
+
+        self.levels = np.asarray(levels)
+
+    def gen_attr_change(self, level) -> definition.AttrChangeSet:
+        """Generate the changes for the experiment with the given level."""
+        raise NotImplementedError
+
+    def n_exp(self) -> int:
+        return len(self.levels)
+
+    def gen_attr_changelist(self) -> tp.Sequence[definition.AttrChangeSet]:
+        return _Lazy(len(self.levels), self._attr_change_at)
+
+    def gen_exp_names(self) -> tp.Sequence[str]:
+        return _Lazy(len(self.levels), self._exp_name_at)
+
+    def _attr_change_at(self, i: int) -> definition.AttrChangeSet:
+        return self.gen_attr_change(self.levels[i])
+
+    @staticmethod
+    def _exp_name_at(i: int) -> str:
+        return "exp" + str(i)
+
+    def graph_info(
+        self,
+        cmdopts: types.Cmdopts,
+        batch_output_root: tp.Optional[pathlib.Path] = None,
+        exp_names: tp.Optional[list[str]] = None,
+    ) -> bcbridge.GraphInfo:
+        info = bcbridge.GraphInfo(
+            cmdopts,
+            batch_output_root,
+            exp_names if exp_names else list(self.gen_exp_names()),
+        )
+
+        info.xticks = list(map(float, range(0, len(info.exp_names))))
+        info.xticklabels = [str(s) for s in self.levels]
+        info.xlabel = self.kXLABEL
+        return info
+
+
+def linspace_parse(cli_arg: str, scale_factor: float = 1.0) -> np.ndarray:
+    """
+    Generate the levels for each experiment in a batch.
+
+    Same as :func:`sierra.core.variables.builtin.linspace_parse`, but
+    takes the whole cmdline definition and returns an array.
+    """
+    # remove batch criteria variable name, leaving only the spec
+    spec = ".".join(cli_arg.split(".")[1:])
+
+    regex = r"(\d+)\.(\d+)\s*\.C\s*(\d+)\s*"
+    res = re.match(regex, spec)
+    assert res is not None, f"Spec must match {regex}, have {spec}"
+
+    _min = float(res.group(1)) * scale_factor
+    _max = float(res.group(2)) * scale_factor
+    cardinality = int(res.group(3))
+    return np.linspace(_min, _max, cardinality)
+
+
+__api__ = ["NumericBatchCriteria", "linspace_parse"]
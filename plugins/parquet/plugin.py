@@ -0,0 +1,47 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Storage plugin for reading/writing apache .parquet files using polars.
+
+Use with ``--storage=plugins.parquet`` to read experimental run outputs written
+by an engine with ``--output-format=parquet``.
+"""
+
+# Core packages
+import pathlib
+import typing as tp
+
+# 3rd party packages
+from retry import retry
+import polars as pl
+
+# Project packages
+
+
+def supports_input(fmt: str) -> bool:
+    return fmt == ".parquet"
+
+
+def supports_output(fmt: type) -> bool:
+    return fmt is pl.DataFrame
+
+
+@retry(Exception, tries=10, delay=0.100, backoff=1.1)
+def df_read(
+    path: pathlib.Path, run_output_root: tp.Optional[pathlib.Path] = None, **kwargs
+) -> pl.DataFrame:
+    """
+    Read a polars dataframe from an apache .parquet file.
+    """
+    return pl.read_parquet(path, **kwargs)
+
+
+@retry(Exception, tries=10, delay=0.100, backoff=1.1)
+def df_write(df: pl.DataFrame, path: pathlib.Path, **kwargs) -> None:
+    """
+    Write a polars dataframe to an apache .parquet file.
+    """
+    df.write_parquet(path, compression="zstd", **kwargs)
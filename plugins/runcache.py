@@ -0,0 +1,299 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Content-addressed cache of experimental run outputs for the sample engines.
+
+Each run is keyed by a hash of:
+
+- Its configuration file, minus ``output_root`` (which is different for every
+  run even when nothing else is).
+
+- The source of the simulator.
+
+- Any other simulator cmdline flags which affect outputs.
+
+``runcache.py exec`` wraps the simulator command. On a hit, the cached outputs
+are materialized into the run's ``output_root`` without running anything. On a
+miss, the simulator is run, and its outputs are added to the cache if it
+succeeds. Files are copied into/out of the cache, never hardlinked: run outputs
+are not always written through this script (e.g., when a batch is re-run
+without the cache), and a simulator writing to an output in place must never
+change a cache entry. Copies are reflinks (copy-on-write, so as cheap as a
+hardlink) on filesystems which support them.
+
+The cache is bounded in size; least recently used entries are evicted first.
+``runcache.py stats`` and ``runcache.py clear`` inspect/empty it.
+
+Only stdlib modules are used (plus ``yaml`` for YAML configs), to keep overhead
+per run small.
+"""
+
+# Core packages
+import argparse
+import contextlib
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import time
+import typing as tp
+
+# 3rd party packages
+
+# Project packages
+
+_kMETA_LEAF = "meta.json"
+_kFILES_LEAF = "files"
+
+# ioctl(2) request for reflinking a whole file (FICLONE in linux/fs.h)
+_kFICLONE = 0x40049409
+
+
+def _load_config(path: pathlib.Path) -> dict:
+    with open(path, "r") as f:
+        if path.suffix in [".yaml", ".yml"]:
+            import yaml
+
+            return yaml.safe_load(f)
+
+        return json.load(f)
+
+
+def run_key(config: dict, sources: list[str], flags: list[str]) -> str:
+    """
+    Compute the cache key of a run.
+    """
+    h = hashlib.sha256()
+
+    config = {k: v for k, v in config.items() if k != "output_root"}
+    h.update(json.dumps(config, sort_keys=True).encode())
+
+    for source in sources:
+        with open(source, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+
+    for flag in sorted(flags):
+        h.update(flag.encode())
+
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def _locked(cache_dir: pathlib.Path, mode: int) -> tp.Iterator[None]:
+    with open(cache_dir / "lock", "a") as lock:
+        fcntl.flock(lock, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _copy_file(src: pathlib.Path, dest: pathlib.Path) -> None:
+    """
+    Copy a file, as a reflink if the filesystem supports it.
+    """
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _kFICLONE, s.fileno())
+        except OSError as e:
+            if e.errno not in [
+                errno.EOPNOTSUPP,
+                errno.ENOTTY,
+                errno.EXDEV,
+                errno.EINVAL,
+                errno.ENOSYS,
+            ]:
+                raise
+
+            shutil.copyfileobj(s, d, 1 << 20)
+
+    shutil.copystat(src, dest)
+
+
+def _copy_tree(src: pathlib.Path, dest: pathlib.Path) -> int:
+    """
+    Recreate ``src`` under ``dest``, copying files.
+
+    Returns the total size of the files.
+    """
+    n_bytes = 0
+    for dirpath, _, filenames in os.walk(src):
+        rel = pathlib.Path(dirpath).relative_to(src)
+        (dest / rel).mkdir(parents=True, exist_ok=True)
+
+        for f in filenames:
+            s = pathlib.Path(dirpath) / f
+            _copy_file(s, dest / rel / f)
+            n_bytes += s.stat().st_size
+
+    return n_bytes
+
+
+def _update_stats(cache_dir: pathlib.Path, key: str) -> None:
+    # Caller holds the exclusive lock
+    path = cache_dir / "stats.json"
+    stats = json.loads(path.read_text()) if path.exists() else {}
+    stats[key] = stats.get(key, 0) + 1
+    path.write_text(json.dumps(stats))
+
+
+def _evict(cache_dir: pathlib.Path, max_bytes: int) -> None:
+    # Caller holds the exclusive lock
+    entries = []
+    for entry in (cache_dir / "entries").iterdir():
+        # Entries other runs are still building
+        if entry.name.startswith("."):
+            continue
+
+        try:
+            meta = entry / _kMETA_LEAF
+            entries.append((meta.stat().st_mtime, json.loads(meta.read_text()), entry))
+        except (OSError, ValueError):
+            # Half-written entry from a crashed run
+            shutil.rmtree(entry, ignore_errors=True)
+
+    total = sum(meta["bytes"] for _, meta, _ in entries)
+    for _, meta, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= meta["bytes"]
+
+
+def exec_(args: argparse.Namespace) -> int:
+    cache_dir = pathlib.Path(args.cache_dir)
+    (cache_dir / "entries").mkdir(parents=True, exist_ok=True)
+
+    cmd = args.cmd[1:] if args.cmd and args.cmd[0] == "--" else args.cmd
+    config = _load_config(pathlib.Path(args.config))
+    output_root = pathlib.Path(config["output_root"])
+    key = run_key(config, args.source, args.flag)
+    entry = cache_dir / "entries" / key
+
+    # Start from scratch, so stale outputs from a previous run are neither
+    # mixed in with a hit nor added to the cache on a miss.
+    shutil.rmtree(output_root, ignore_errors=True)
+
+    with _locked(cache_dir, fcntl.LOCK_SH):
+        hit = entry.exists()
+        if hit:
+            _copy_tree(entry / _kFILES_LEAF, output_root)
+            os.utime(entry / _kMETA_LEAF)
+
+    if hit:
+        with _locked(cache_dir, fcntl.LOCK_EX):
+            _update_stats(cache_dir, "hits")
+        return 0
+
+    returncode = subprocess.call(cmd)
+    if returncode != 0:
+        return returncode
+
+    # Build the entry off to the side, so it only appears once complete.
+    tmp = cache_dir / "entries" / f".{key}.{os.getpid()}"
+    n_bytes = _copy_tree(output_root, tmp / _kFILES_LEAF)
+    (tmp / _kMETA_LEAF).write_text(
+        json.dumps({"bytes": n_bytes, "created": time.time(), "cmd": cmd})
+    )
+
+    with _locked(cache_dir, fcntl.LOCK_EX):
+        try:
+            tmp.rename(entry)
+        except OSError:
+            # Another run with the same key got there first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        _update_stats(cache_dir, "misses")
+        _evict(cache_dir, args.max_size_mib * 1024**2)
+
+    return 0
+
+
+def stats(args: argparse.Namespace) -> int:
+    cache_dir = pathlib.Path(args.cache_dir)
+    if not (cache_dir / "entries").exists():
+        print(f"No cache at {cache_dir}")
+        return 0
+
+    with _locked(cache_dir, fcntl.LOCK_SH):
+        metas = [
+            json.loads((e / _kMETA_LEAF).read_text())
+            for e in (cache_dir / "entries").iterdir()
+            if (e / _kMETA_LEAF).exists()
+        ]
+        path = cache_dir / "stats.json"
+        counts = json.loads(path.read_text()) if path.exists() else {}
+
+    hits = counts.get("hits", 0)
+    misses = counts.get("misses", 0)
+    print(f"Cache:   {cache_dir}")
+    print(f"Entries: {len(metas)}")
+    print(f"Size:    {sum(m['bytes'] for m in metas) / 1024**2:.2f} MiB")
+    print(f"Hits:    {hits}")
+    print(f"Misses:  {misses}")
+    if hits + misses:
+        print(f"Hit rate: {hits / (hits + misses):.1%}")
+
+    return 0
+
+
+def clear(args: argparse.Namespace) -> int:
+    cache_dir = pathlib.Path(args.cache_dir)
+    if not (cache_dir / "entries").exists():
+        return 0
+
+    with _locked(cache_dir, fcntl.LOCK_EX):
+        shutil.rmtree(cache_dir / "entries")
+        (cache_dir / "stats.json").unlink(missing_ok=True)
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Content-addressed cache of experimental run outputs."
+    )
+    sub = parser.add_subparsers(dest="op", required=True)
+
+    exec_p = sub.add_parser("exec", help="Run a simulator command through the cache.")
+    exec_p.add_argument("--config", required=True, help="Run configuration file.")
+    exec_p.add_argument(
+        "--source",
+        action="append",
+        default=[],
+        help="Simulator source file(s) outputs depend on.",
+    )
+    exec_p.add_argument(
+        "--flag",
+        action="append",
+        default=[],
+        help="Other simulator flag(s) outputs depend on, as <name>=<value>.",
+    )
+    exec_p.add_argument(
+        "--max-size-mib",
+        type=int,
+        default=10240,
+        help="Evict least recently used entries beyond this size.",
+    )
+    exec_p.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run.")
+
+    sub.add_parser("stats", help="Show cache size and hit rate.")
+    sub.add_parser("clear", help="Remove all cache entries.")
+
+    for p in sub.choices.values():
+        p.add_argument("--cache-dir", required=True, help="Cache directory.")
+
+    args = parser.parse_args()
+    return {"exec": exec_, "stats": stats, "clear": clear}[args.op](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
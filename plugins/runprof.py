@@ -0,0 +1,255 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Per-run resource profiling for the sample engines.
+
+Hooked into each experimental run's command line via the engine's
+pre/exec/post run commands when ``--profile-runs`` is passed:
+
+- The pre-run command exports the path of a per-run stamp file in
+  :data:`kSTAMP_ENV`.
+
+- ``runprof.py exec -- <cmd>`` runs the simulator and records wall time, CPU
+  time, peak RSS and exit status in the stamp.
+
+- ``runprof.py finish --output-root R`` adds the total bytes written under
+  ``R``, writes the result to ``R/runprof.json``, and exits with the
+  simulator's exit status so failures still fail the run.
+
+``runprof.py aggregate --batch-root B`` then collects the sidecars for a batch
+into per-run, per-experiment and per-batch tables under ``B/statistics``.
+
+Only stdlib modules are used, to keep overhead per run small.
+"""
+
+# Core packages
+import argparse
+import csv
+import json
+import os
+import pathlib
+import re
+import resource
+import subprocess
+import sys
+import time
+
+# 3rd party packages
+
+# Project packages
+
+kSTAMP_ENV = "SIERRA_RUNPROF_STAMP"
+kSIDECAR_LEAF = "runprof.json"
+
+_kRUN_FIELDS = [
+    "exp",
+    "run",
+    "wall_s",
+    "cpu_s",
+    "maxrss_mib",
+    "bytes_written",
+    "returncode",
+]
+_kEXP_FIELDS = [
+    "exp",
+    "n_runs",
+    "wall_s_mean",
+    "wall_s_max",
+    "cpu_s_mean",
+    "cpu_s_total",
+    "maxrss_mib_max",
+    "bytes_written_mean",
+    "bytes_written_total",
+    "n_failed",
+]
+
+
+def _read(path: pathlib.Path) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write(path: pathlib.Path, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def exec_(args: argparse.Namespace) -> int:
+    cmd = args.cmd[1:] if args.cmd and args.cmd[0] == "--" else args.cmd
+
+    start = time.monotonic()
+    returncode = subprocess.call(cmd)
+    wall = time.monotonic() - start
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    _write(
+        pathlib.Path(args.stamp),
+        {
+            "cmd": cmd,
+            "wall_s": wall,
+            "cpu_s": usage.ru_utime + usage.ru_stime,
+            # Linux reports KiB
+            "maxrss_mib": usage.ru_maxrss / 1024,
+            "returncode": returncode,
+        },
+    )
+    return returncode
+
+
+def finish(args: argparse.Namespace) -> int:
+    stamp = pathlib.Path(args.stamp)
+    output_root = pathlib.Path(args.output_root)
+
+    try:
+        prof = _read(stamp)
+        stamp.unlink()
+    except FileNotFoundError:
+        # The simulator never got to run
+        prof = {"returncode": 1}
+
+    # Hard/reflinked outputs only take up space once
+    seen = set()
+    n_bytes = 0
+    for dirpath, _, filenames in os.walk(output_root):
+        for f in filenames:
+            st = os.lstat(os.path.join(dirpath, f))
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                n_bytes += st.st_size
+
+    prof["bytes_written"] = n_bytes
+    _write(output_root / kSIDECAR_LEAF, prof)
+
+    return prof["returncode"]
+
+
+def _natural_key(s: str) -> list:
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", s)]
+
+
+def _load_runs(batch_root: pathlib.Path) -> list[dict]:
+    rows = []
+    for exp in sorted(
+        (batch_root / "exp-outputs").iterdir(), key=lambda p: _natural_key(p.name)
+    ):
+        if not exp.is_dir():
+            continue
+
+        for run in sorted(exp.iterdir(), key=lambda p: _natural_key(p.name)):
+            sidecar = run / kSIDECAR_LEAF
+            if not sidecar.exists():
+                continue
+
+            prof = _read(sidecar)
+            rows.append(
+                {
+                    "exp": exp.name,
+                    "run": run.name,
+                    **{k: prof.get(k) for k in _kRUN_FIELDS[2:]},
+                }
+            )
+    return rows
+
+
+def _summarize(name: str, rows: list[dict]) -> dict:
+    def _vals(key: str) -> list:
+        return [r[key] for r in rows if r[key] is not None]
+
+    wall = _vals("wall_s")
+    cpu = _vals("cpu_s")
+    rss = _vals("maxrss_mib")
+    written = _vals("bytes_written")
+
+    return {
+        "exp": name,
+        "n_runs": len(rows),
+        "wall_s_mean": sum(wall) / len(wall) if wall else None,
+        "wall_s_max": max(wall, default=None),
+        "cpu_s_mean": sum(cpu) / len(cpu) if cpu else None,
+        "cpu_s_total": sum(cpu),
+        "maxrss_mib_max": max(rss, default=None),
+        "bytes_written_mean": sum(written) / len(written) if written else None,
+        "bytes_written_total": sum(written),
+        "n_failed": sum(1 for r in rows if r["returncode"] != 0),
+    }
+
+
+def _write_csv(path: pathlib.Path, fields: list[str], rows: list[dict]) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def aggregate(args: argparse.Namespace) -> int:
+    batch_root = pathlib.Path(args.batch_root)
+    rows = _load_runs(batch_root)
+
+    if not rows:
+        sys.stderr.write(f"No {kSIDECAR_LEAF} files found under {batch_root}\n")
+        return 1
+
+    exps = {}
+    for r in rows:
+        exps.setdefault(r["exp"], []).append(r)
+
+    per_exp = [_summarize(name, exp_rows) for name, exp_rows in exps.items()]
+    per_batch = [_summarize("batch", rows)]
+
+    opath = batch_root / "statistics"
+    opath.mkdir(parents=True, exist_ok=True)
+    _write_csv(opath / "runprof-runs.csv", _kRUN_FIELDS, rows)
+    _write_csv(opath / "runprof-exp.csv", _kEXP_FIELDS, per_exp)
+    _write_csv(opath / "runprof-batch.csv", _kEXP_FIELDS, per_batch)
+
+    print(
+        f"{'exp':<16} {'runs':>5} {'wall mean (s)':>14} {'cpu mean (s)':>13} "
+        f"{'maxrss (MiB)':>13} {'written (MiB)':>14} {'failed':>7}"
+    )
+    for s in per_exp + per_batch:
+        print(
+            f"{s['exp']:<16} {s['n_runs']:>5} {s['wall_s_mean'] or 0:>14.3f} "
+            f"{s['cpu_s_mean'] or 0:>13.3f} {s['maxrss_mib_max'] or 0:>13.1f} "
+            f"{s['bytes_written_total'] / 1024**2:>14.2f} {s['n_failed']:>7}"
+        )
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Per-run resource profiling for the sample engines."
+    )
+    sub = parser.add_subparsers(dest="op", required=True)
+
+    exec_p = sub.add_parser("exec", help="Run and profile a simulator command.")
+    exec_p.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run.")
+
+    finish_p = sub.add_parser("finish", help="Write the sidecar for a run.")
+    finish_p.add_argument(
+        "--output-root", required=True, help="Output directory of the run."
+    )
+
+    for p in [exec_p, finish_p]:
+        p.add_argument(
+            "--stamp",
+            default=os.environ.get(kSTAMP_ENV),
+            help=f"Per-run stamp file (default: ${kSTAMP_ENV}).",
+        )
+
+    agg_p = sub.add_parser("aggregate", help="Tabulate the sidecars for a batch.")
+    agg_p.add_argument("--batch-root", required=True, help="Batch root directory.")
+
+    args = parser.parse_args()
+
+    if args.op in ["exec", "finish"] and args.stamp is None:
+        parser.error(f"--stamp not given and ${kSTAMP_ENV} not set")
+
+    return {"exec": exec_, "finish": finish, "aggregate": aggregate}[args.op](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
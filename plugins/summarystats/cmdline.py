@@ -0,0 +1,21 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Cmdline for ``plugins.summarystats``: the same as ``proc.statistics``.
+"""
+
+# Core packages
+
+# 3rd party packages
+
+# Project packages
+from sierra.plugins.proc.statistics.cmdline import (
+    build,
+    to_cmdopts,
+    sphinx_cmdline_multistage,
+)
+
+__all__ = ["build", "to_cmdopts", "sphinx_cmdline_multistage"]
@@ -0,0 +1,107 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Gathering raw outputs of runs which were compacted after collation.
+
+Runs compacted by ``plugins.collate`` (see :mod:`plugins.collate.compacted`)
+have no ``run_metrics_leaf`` directory anymore, so ``proc.statistics`` finds
+nothing to gather from them. :class:`CompactedGatherer` finds and reads the
+same files from the experiment's archive instead, so statistics are the same
+either way.
+"""
+
+# Core packages
+import io
+import pathlib
+import typing as tp
+
+# 3rd party packages
+
+# Project packages
+from sierra.core import storage
+from sierra.core.pipeline.stage3 import gather
+import sierra.core.plugin as pm
+from sierra.plugins.proc.statistics import plugin as statistics
+from plugins.collate.compacted import Archive
+
+
+class CompactedGatherer(statistics.DataGatherer):
+    """
+    Gather raw outputs like ``proc.statistics``, from archives for compacted runs.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Experiment -> its archive, if it was compacted
+        self._archives = {}  # type: tp.Dict[pathlib.Path, tp.Optional[Archive]]
+
+    def calc_gather_items(
+        self, run_output_root: pathlib.Path, exp_name: str
+    ) -> list[gather.GatherSpec]:
+        archive = self.archive(run_output_root.parent)
+        if (run_output_root / self.run_metrics_leaf).exists() or archive is None:
+            return super().calc_gather_items(run_output_root, exp_name)
+
+        # Same files proc.statistics would have gathered from disk
+        plugin = pm.pipeline.get_plugin_module(self.gather_opts["storage"])
+        stems = [
+            graph["src_stem"]
+            for kind in ["intra-exp", "inter-exp"]
+            for category in self.config.get(kind, {}).values()
+            for graph in category
+        ]
+        return [
+            gather.GatherSpec(
+                exp_name=exp_name,
+                item_stem_path=pathlib.Path(item),
+                collate_col=None,
+            )
+            for item, size in archive.items(run_output_root.name).items()
+            if size > 0
+            and any(plugin.supports_input(s) for s in pathlib.Path(item).suffixes)
+            and any(stem in item for stem in stems)
+        ]
+
+    def archive(self, exp_output_root: pathlib.Path) -> tp.Optional[Archive]:
+        if exp_output_root not in self._archives:
+            self._archives[exp_output_root] = Archive.of(exp_output_root)
+
+        return self._archives[exp_output_root]
+
+    def _gather_item_from_runs(
+        self,
+        exp_output_root: pathlib.Path,
+        spec: gather.GatherSpec,
+        runs: list[pathlib.Path],
+    ) -> gather.ProcessSpec:
+        archive = self.archive(exp_output_root)
+        item = spec.item_stem_path.as_posix()
+        to_process = gather.ProcessSpec(gather=spec)
+
+        # Run by run, so dataframes stay in the same order as the runs
+        for run in runs:
+            if (
+                (run / self.run_metrics_leaf).exists()
+                or archive is None
+                or not archive.has(run.name, item)
+            ):
+                from_run = super()._gather_item_from_runs(exp_output_root, spec, [run])
+                to_process.exp_run_names.extend(from_run.exp_run_names)
+                to_process.dfs.extend(from_run.dfs)
+            elif archive.items(run.name)[item] > 0:
+                # Storage plugins read with polars, which reads from memory too
+                df = storage.df_read(
+                    io.BytesIO(archive.read_bytes(run.name, item)),
+                    self.gather_opts["storage"],
+                    run_output_root=run,
+                )
+                to_process.exp_run_names.append(run.name)
+                to_process.dfs.append(df)
+
+        return to_process
+
+
+__all__ = ["CompactedGatherer"]
@@ -0,0 +1,99 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Drop-in replacement for ``proc.statistics`` which uses summary sidecars.
+
+Use with ``--proc plugins.summarystats ...`` instead of ``proc.statistics``,
+for batches run with ``--output-summary``. Outputs which are only needed for
+inter-experiment summary line graphs and heatmaps (see
+:func:`plugins.summarystats.sidecars.aggregate_only_stems`) get their
+statistics from the sidecars of each run; everything else is processed by
+``proc.statistics`` from the raw outputs, as usual. Without sidecars, this is
+the same as ``proc.statistics``, except that raw outputs (and sidecars) of runs
+compacted by ``plugins.collate`` are read from their archives.
+"""
+
+# Core packages
+import multiprocessing as mp
+import logging
+import pathlib
+
+# 3rd party packages
+import yaml
+
+# Project packages
+import sierra.core.variables.batch_criteria as bc
+from sierra.core import types, utils, batchroot, config
+from sierra.plugins.proc.statistics import plugin as statistics
+from plugins.summarystats import sidecars
+
+_logger = logging.getLogger(__name__)
+
+
+def proc_batch_exp(
+    main_config: types.YAMLDict,
+    cmdopts: types.Cmdopts,
+    pathset: batchroot.PathSet,
+    criteria: bc.XVarBatchCriteria,
+) -> None:
+    """Generate statistics for each experiment, from sidecars where possible."""
+    config_root = pathlib.Path(cmdopts["project_config_root"])
+    config_path = config_root / config.PROJECT_YAML.graphs
+    graphs_config = {}
+    if utils.path_exists(config_path):
+        with utils.utf8open(config_path) as f:
+            graphs_config = yaml.safe_load(f)
+
+    # From --prod=prod.graphs, if it is active
+    stems = sidecars.aggregate_only_stems(
+        graphs_config, cmdopts.get("exp_graphs", "all")
+    )
+    exp_to_proc = utils.exp_range_calc(
+        cmdopts["exp_range"], pathset.output_root, criteria.gen_exp_names()
+    )
+    leaf = main_config["sierra"]["run"]["run_metrics_leaf"]
+
+    handled = {
+        exp.name: {stem for stem in stems if sidecars.available(exp, stem, leaf)}
+        for exp in exp_to_proc
+    }
+
+    # In child processes: once polars has started its thread pool here, the
+    # processes proc.statistics forks to gather outputs can deadlock in it.
+    with mp.Pool(processes=cmdopts["processing_parallelism"]) as pool:
+        pool.starmap(
+            sidecars.write_stats,
+            [
+                (
+                    exp,
+                    stem,
+                    leaf,
+                    pathset.stat_root / exp.name,
+                    cmdopts["dist_stats"],
+                    cmdopts["df_homogenize"],
+                )
+                for exp in exp_to_proc
+                for stem in handled[exp.name]
+            ],
+        )
+
+    _logger.info(
+        "Generated statistics for %s outputs from summary sidecars; "
+        "processing the rest from raw outputs",
+        sum(len(h) for h in handled.values()),
+    )
+
+    sidecars.SidecarGatherer.handled = handled
+    statistics.proc_batch_exp(
+        main_config,
+        cmdopts,
+        pathset,
+        criteria,
+        gatherer_type=sidecars.SidecarGatherer,
+    )
+
+
+__all__ = ["proc_batch_exp"]
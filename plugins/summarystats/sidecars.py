@@ -0,0 +1,167 @@
+#
+# Copyright 2025 John Harwell, All rights reserved.
+#
+# SPDX-License Identifier: MIT
+#
+"""
+Statistics from the summary sidecars written by the sample engines.
+
+With ``--output-summary``, JSONSIM/YAMLSIM write ``<stem>.summary.json`` next
+to each output, with the first/last value of each numeric column (among other
+things). That is all inter-experiment summary line graphs and heatmaps use from
+the :term:`Experiment` statistics files ``proc.statistics`` generates: a single
+row, picked via their ``index`` (first or last by default). So for outputs only
+such graphs need, statistics are computed from the sidecars instead, with the
+same kernels, and ``proc.statistics`` skips reading them. Sidecars of
+compacted runs are read from their experiment's archive.
+"""
+
+# Core packages
+import json
+import pathlib
+import typing as tp
+
+# 3rd party packages
+import polars as pl
+
+# Project packages
+from sierra.core import types, utils, storage
+from sierra.plugins.proc.statistics import kernels
+from plugins.collate import compacted as archives
+from plugins.summarystats import compacted
+
+kSUMMARY_SUFFIX = ".summary.json"
+
+# Inter-experiment graphs which only need one row from the statistics files
+kAGGREGATE_GRAPHS = ["summary_line", "heatmap"]
+
+# Rows available from a sidecar, as graph ``index`` values
+_kROWS = {0: "first", -1: "last"}
+
+
+def aggregate_only_stems(graphs_config: types.YAMLDict, exp_graphs: str) -> set[str]:
+    """
+    Get the output stems which only aggregate-only graphs will be generated from.
+
+    Outputs also used for any other graph (e.g., intra-experiment graphs with
+    ``--exp-graphs=all``) need their statistics computed from every row.
+    """
+    full = set()
+    aggregate = set()
+
+    if exp_graphs in ["all", "intra"]:
+        for category in (graphs_config.get("intra-exp") or {}).values():
+            full |= {graph["src_stem"] for graph in category}
+
+    if exp_graphs in ["all", "inter"]:
+        for category in (graphs_config.get("inter-exp") or {}).values():
+            for graph in category:
+                if (
+                    graph["type"] in kAGGREGATE_GRAPHS
+                    and graph.get("index", -1) in _kROWS
+                ):
+                    aggregate.add(graph["src_stem"])
+                else:
+                    full.add(graph["src_stem"])
+
+    return aggregate - full
+
+
+def available(exp_output_root: pathlib.Path, stem: str, run_metrics_leaf: str) -> bool:
+    """
+    Check if every run in an experiment has a summary sidecar for an output.
+    """
+    runs = list(exp_output_root.iterdir())
+    archive = archives.Archive.of(exp_output_root)
+    return bool(runs) and all(
+        _sidecar_path(run / run_metrics_leaf, stem).exists()
+        or (archive is not None and archive.has(run.name, stem + kSUMMARY_SUFFIX))
+        for run in runs
+    )
+
+
+def write_stats(
+    exp_output_root: pathlib.Path,
+    stem: str,
+    run_metrics_leaf: str,
+    exp_stat_root: pathlib.Path,
+    dist_stats: str,
+    df_homogenize: str,
+) -> None:
+    """
+    Write statistics files for an output, computed from its summary sidecars.
+
+    Same files, kernels and output as ``proc.statistics``, but with only the
+    rows aggregate-only graphs can use: the first and last.
+    """
+    archive = archives.Archive.of(exp_output_root)
+    dfs = []
+    for run in exp_output_root.iterdir():
+        path = _sidecar_path(run / run_metrics_leaf, stem)
+        if path.exists() or archive is None:
+            with utils.utf8open(path) as f:
+                summary = json.load(f)
+        else:
+            summary = json.loads(archive.read_bytes(run.name, stem + kSUMMARY_SUFFIX))
+
+        dfs.append(
+            pl.DataFrame(
+                {
+                    col: [stats[row] for row in _kROWS.values()]
+                    for col, stats in summary["cols"].items()
+                }
+            ).with_row_index("row_idx")
+        )
+
+    # Same as proc.statistics does for each output from all runs
+    concat = pl.concat(dfs, how="vertical")
+    by_row_index = concat.group_by("row_idx")
+
+    dfs = {}
+    if dist_stats in ["none", "all"]:
+        dfs.update(kernels.mean(by_row_index, concat))
+
+    if dist_stats in ["conf95", "all"]:
+        dfs.update(kernels.conf95(by_row_index, concat))
+
+    if dist_stats in ["bw", "all"]:
+        dfs.update(kernels.bw(by_row_index, concat))
+
+    opath = exp_stat_root / stem
+    utils.dir_create_checked(opath.parent, exist_ok=True)
+    for ext, df in dfs.items():
+        storage.df_write(
+            utils.df_fill(df, df_homogenize),
+            opath.with_name(opath.name + ext),
+            "storage.csv",
+        )
+
+
+class SidecarGatherer(compacted.CompactedGatherer):
+    """
+    Gather raw outputs like ``proc.statistics``, except those in :attr:`handled`.
+    """
+
+    # Experiment name -> stems whose statistics were computed from sidecars. Set
+    # before proc.statistics starts its (forked) gatherer processes.
+    handled = {}  # type: tp.Dict[str, tp.Set[str]]
+
+    def calc_gather_items(self, run_output_root: pathlib.Path, exp_name: str):
+        skip = self.handled.get(exp_name, set())
+        return [
+            spec
+            for spec in super().calc_gather_items(run_output_root, exp_name)
+            if spec.item_stem_path.with_suffix("").as_posix() not in skip
+        ]
+
+
+def _sidecar_path(output_root: pathlib.Path, stem: str) -> pathlib.Path:
+    return output_root / (stem + kSUMMARY_SUFFIX)
+
+
+__all__ = [
+    "SidecarGatherer",
+    "aggregate_only_stems",
+    "available",
+    "write_stats",
+]
@@ -34,6 +34,200 @@ def build(
              """,
         required=True,
     )
+
+    cmdline.stage1.add_argument(
+        "--exec-mode",
+        choices=["subprocess", "async"],
+        default="subprocess",
+        help="""
+             How each experimental run is executed.
+
+             - ``subprocess`` - GNU parallel starts a shell running ``python3
+               yamlsim.py`` for each run.
+
+             - ``async`` - Launch all runs in each experiment from a single
+               asyncio launcher (``plugins/asynclaunch.py``) instead of GNU
+               parallel, without a shell per run. At most
+               ``--exec-jobs-per-node`` runs execute at once, a new run
+               starts as soon as any finishes, and runs are held back while
+               too much output is waiting to be written to disk. Per-run
+               stdout/stderr go to ``<batchroot>/scratch/<exp>``. Experiments
+               are run one after another. Can't be used with
+               ``--profile-runs``.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--exec-paradigm",
+        choices=["per-batch", "per-exp", "auto"],
+        default=None,
+        help="""
+             How experimental runs are scheduled in stage 2.
+
+             - ``per-batch`` - All runs in the batch are scheduled together,
+               so a new run starts as soon as any run finishes, regardless of
+               experiment. Keeps all ``--exec-jobs-per-node`` slots busy.
+
+             - ``per-exp`` - Experiments are run one after another, waiting
+               for all runs in one to finish before starting the next. Slots
+               can idle at the end of each experiment, but each experiment
+               is complete (and can be processed) as soon as it finishes.
+
+             - ``auto`` - Pick one from the # of runs per experiment, the
+               estimated run duration (YAMLSIM outputs are a fixed size) and
+               the # of runs this node can execute in parallel: ``per-exp`` if
+               that costs little extra time, ``per-batch`` otherwise. The
+               choice and why is logged. Since it depends on the node, pass
+               an explicit paradigm if stages 1 and 2 run on different nodes.
+
+             Defaults to ``per-batch``, or ``per-exp`` with
+             ``--exec-mode=async``, which requires it. For batches of many
+             very short runs, ``--exec-mode=async`` is usually fastest.
+             ``--exec-parallelism-paradigm`` overrides this.
+             """
+        + cmdline.stage_usage_doc([1, 2]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--exec-collate",
+        action="store_true",
+        help="""
+             Collate each experiment during stage 2, as soon as all of its
+             runs finish, instead of all at once in stage 3. The run which
+             completes an experiment collates it (see
+             ``plugins/collate/pipelined.py``) while runs from other
+             experiments carry on. Use ``--proc plugins.collate`` instead of
+             ``proc.collate`` in stage 3, which then only collates
+             experiments which weren't collated during stage 2 (e.g.,
+             because a run failed). Collated outputs are the same either way.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--exec-collate-retain",
+        choices=["keep", "compact", "delete"],
+        default="keep",
+        help="""
+             What to do with raw run outputs once ``--exec-collate`` has
+             collated their experiment.
+
+             - ``keep`` - Nothing.
+
+             - ``compact`` - Pack the output directories of all runs in the
+               experiment into a single archive under
+               ``<batchroot>/compacted``, and delete them. Use ``--proc
+               plugins.summarystats`` instead of ``proc.statistics`` in stage
+               3 to read raw outputs from the archives; ``--proc
+               plugins.collate`` reads them too, if experiments need to be
+               collated again. No other ``--proc`` plugin reads archives
+               (they find no raw outputs for compacted experiments), and a
+               warning is logged in stage 2 if any are selected.
+
+             - ``delete`` - Delete each run's output directory, for when only
+               collated outputs are needed. Stage 3 processing of raw outputs
+               (e.g., ``proc.statistics``) then has nothing to work with for
+               those experiments.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--output-format",
+        choices=["csv", "parquet", "arrow"],
+        default="csv",
+        help="""
+             The format YAMLSIM writes tabular experimental run outputs in;
+             graphs are always written as GraphML.
+
+             - ``csv`` - Plain text CSV files.
+
+             - ``parquet`` - zstd compressed Apache Parquet files. Read them
+               back with ``--storage=plugins.parquet``.
+
+             - ``arrow`` - zstd compressed Apache Arrow IPC files. Read them
+               back with ``--storage=storage.arrow``.
+
+             The binary formats are much smaller on disk and much faster to
+             read during stage 3 than CSV, but require ``pyarrow``.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--output-summary",
+        action="store_true",
+        help="""
+             Have YAMLSIM also write per-column summary stats (first/last
+             value, min, max, mean, std) for each tabular output, to a small
+             ``<stem>.summary.json`` sidecar next to it. Computed as the data
+             is generated, so it costs next to nothing.
+
+             With ``--proc plugins.summarystats`` instead of
+             ``proc.statistics``, stage 3 then uses the sidecars for outputs
+             which only inter-experiment summary line graphs/heatmaps need,
+             instead of reading every row of them.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--profile-runs",
+        action="store_true",
+        help="""
+             Record wall time, CPU time, peak RSS and bytes written for each
+             experimental run in a ``runprof.json`` sidecar in its output
+             directory. Tabulate them per-experiment and per-batch with
+             ``python3 plugins/runprof.py aggregate --batch-root <batch
+             root>`` after stage 2.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--run-cache-dir",
+        help="""
+             Cache experimental run outputs in this directory, keyed by a hash
+             of the run's input file (minus ``output_root``), the YAMLSIM
+             source, and any simulator flags outputs depend on (YAMLSIM has
+             none besides ``--config``).
+             Runs whose key is already in the cache have their outputs copied
+             into place instead of being executed. Since the key includes each
+             run's random seed, hits mostly come from re-running a batch whose
+             seeds were preserved (see ``--preserve-seeds``), e.g., after a
+             crash.
+
+             Inspect/empty the cache with ``python3 plugins/runcache.py
+             {stats,clear} --cache-dir <dir>``.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--run-cache-size",
+        type=int,
+        default=10240,
+        help="""
+             Max size of ``--run-cache-dir`` in MiB; least recently used runs
+             are evicted beyond this.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
+    cmdline.stage1.add_argument(
+        "--exp-gen-workers",
+        type=int,
+        default=1,
+        help="""
+             # of worker processes to generate experiment definitions with
+             during stage 1; 0 uses all cores. With the default of 1,
+             experiments are generated serially. The generated files are the
+             same either way.
+             """
+        + cmdline.stage_usage_doc([1]),
+    )
+
     return cmdline
 
 
@@ -42,4 +236,14 @@ def to_cmdopts(args: argparse.Namespace) -> types.Cmdopts:
     return {
         # Stage 1
         "yamlsim_path": args.yamlsim_path,
+        "exec_mode": args.exec_mode,
+        "exec_paradigm": args.exec_paradigm,
+        "exec_collate": args.exec_collate,
+        "exec_collate_retain": args.exec_collate_retain,
+        "output_format": args.output_format,
+        "output_summary": args.output_summary,
+        "profile_runs": args.profile_runs,
+        "run_cache_dir": args.run_cache_dir,
+        "run_cache_size": args.run_cache_size,
+        "exp_gen_workers": args.exp_gen_workers,
     }
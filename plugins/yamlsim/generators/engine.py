@@ -12,9 +12,9 @@ from sierra.core.experiment import definition
 from sierra.core import types
 import sierra.core.utils as scutils
 from sierra.core.experiment import spec
-from sierra.core import plugin as pm
 
 # Project packages
+from plugins import expdefcache
 
 
 def for_all_exp(
@@ -52,9 +52,11 @@ def for_all_exp(
             }
         ]
     )
-    module = pm.pipeline.get_plugin_module(cmdopts["expdef"])
+    # Runs get copy-on-write clones of this, so it's only parsed once.
+    expdef = expdefcache.load(cmdopts["expdef"], expdef_template_fpath, wr_config)
 
-    expdef = module.ExpDef(input_fpath=expdef_template_fpath, write_config=wr_config)
+    expdef.attr_change("/config", "output_format", cmdopts["output_format"])
+    expdef.attr_change("/config", "output_summary", cmdopts["output_summary"])
 
     return expdef
 
@@ -91,4 +93,5 @@ def for_single_exp_run(
     """
 
     expdef.attr_change("/config", "output_root", str(run_output_path / "output"))
+    expdef.attr_change("/config", "random_seed", random_seed)
     return expdef
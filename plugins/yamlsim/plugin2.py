@@ -8,22 +8,50 @@
 import typing as tp
 import argparse
 import logging
+import math
 import pathlib
-import psutil
+import os
 
 # 3rd party packages
 import implements
+import yaml
 
 # Project packages
 from sierra.core.experiment import bindings, definition
 from sierra.core.variables import batch_criteria as bc
 from sierra.core import types
-from sierra.plugins.execenv import hpc
-from sierra.plugins.execenv import prefectserver
 from plugins.yamlsim import cmdline
+from plugins import asynclaunch
+from plugins.collate import pipelined
+from plugins.collate import compacted
+from plugins import expdefcache
+from plugins import runcache
+from plugins import runprof
 
 _logger = logging.getLogger(__name__)
 
+# Per-run peak memory model, calibrated against the max RSS of YAMLSIM runs:
+# interpreter + numpy/pandas, plus the confusion matrix rows, plus the edges
+# of the largest graph each graph worker holds at once (as lines of text for
+# graphml, as arrays otherwise). Deliberately on the high side.
+_kRUN_MEM_BASE = 160 * 1024**2
+_kRUN_MEM_PER_CONFUSION_ROW = 48
+_kRUN_MEM_PER_EDGE = {"graphml": 288, "edgelist": 48, "npz": 48}
+
+# Mean count per confusion matrix cell, off/on the diagonal; see
+# gen_confusion_matrix() in yamlsim.py.
+_kCONFUSION_OFFDIAG_COUNT = 5
+_kCONFUSION_DIAG_COUNT = 82
+
+# Per-run wall time, from YAMLSIM runs writing CSV; mostly interpreter startup.
+_kRUN_TIME = 0.5
+
+# Time to start GNU parallel for an experiment with per-exp parallelism.
+_kEXP_LAUNCH_TIME = 0.3
+
+# The most extra time --exec-paradigm=auto will accept to run per-exp.
+_kPER_EXP_MAX_OVERHEAD = 0.05
+
 
 @implements.implements(bindings.IExpShellCmdsGenerator)
 class ExpShellCmdsGenerator:
@@ -58,18 +86,79 @@ class ExpRunShellCmdsGenerator:
         n_agents: tp.Optional[int],
     ) -> None:
         self.executable_path = cmdopts["yamlsim_path"]
+        self.exec_mode = cmdopts["exec_mode"]
+        self.profile_runs = cmdopts["profile_runs"]
+        self.run_cache_dir = cmdopts["run_cache_dir"]
+        if self.run_cache_dir:
+            # Runs don't necessarily execute from the cwd SIERRA was invoked in
+            self.run_cache_dir = pathlib.Path(self.run_cache_dir).resolve()
+        self.run_cache_size = cmdopts["run_cache_size"]
+        self.n_runs = cmdopts["n_runs"]
+
+        self.exec_collate = cmdopts["exec_collate"]
+        if self.exec_collate:
+            self.collate_args = (
+                f"--project-config-root {cmdopts['project_config_root']} "
+                f"--storage {cmdopts['storage']} "
+                f"--df-homogenize {cmdopts['df_homogenize']} "
+                f"--retain {cmdopts['exec_collate_retain']}"
+            )
 
-        pass
+        if self.exec_mode == "async":
+            self.async_jobs = cmdopts["exec_jobs_per_node"] or os.cpu_count()
 
     def pre_run_cmds(
         self, host: str, input_fpath: pathlib.Path, run_num: int
     ) -> list[types.ShellCmdSpec]:
-        return []
+        if not self.profile_runs:
+            return []
+
+        # pre/exec/post cmds for a run all end up on the same line in the
+        # cmdfile, so this is visible to the exec and post cmds.
+        return [
+            types.ShellCmdSpec(
+                cmd=f"export {runprof.kSTAMP_ENV}={input_fpath}.runprof;",
+                shell=True,
+                wait=True,
+            )
+        ]
 
     def exec_run_cmds(
         self, host: str, input_fpath: pathlib.Path, run_num: int
     ) -> list[types.ShellCmdSpec]:
-        cmd = f"python3 {self.executable_path} --config {input_fpath}.yaml"
+        if self.exec_mode == "async":
+            # One launcher per experiment runs everything, so only the first
+            # run gets a command; SIERRA skips cmdfile lines for the others.
+            if run_num != 0:
+                return []
+
+            exp_input_root = input_fpath.parent
+            log_dir = exp_input_root.parent.parent / "scratch" / exp_input_root.name
+            cmd = (
+                f"python3 {asynclaunch.__file__} "
+                f"--jobs {self.async_jobs} "
+                f"--n-runs {self.n_runs} "
+                f"--input-stem {str(input_fpath)[: -len('_run0')]} "
+                f"--log-dir {log_dir} -- {self._run_cmd(asynclaunch.kINPUT)}"
+            )
+            if self.exec_collate:
+                # <batchroot>/exp-inputs/<exp> -> <batchroot>/exp-outputs/<exp>
+                exp_output_root = (
+                    exp_input_root.parent.parent / "exp-outputs" / exp_input_root.name
+                )
+                cmd += (
+                    f"; python3 {pipelined.__file__} exp-done --status $? "
+                    f"--exp-output-root {exp_output_root} {self.collate_args}"
+                )
+        else:
+            cmd = self._run_cmd(str(input_fpath))
+
+        if self.profile_runs:
+            cmd = f"python3 {runprof.__file__} exec -- {cmd};"
+        elif self.exec_collate and self.exec_mode != "async":
+            # So the post-run cmd can pick up the exit status
+            cmd += ";"
+
         return [
             types.ShellCmdSpec(
                 cmd=cmd,
@@ -78,10 +167,48 @@ class ExpRunShellCmdsGenerator:
             )
         ]
 
+    def _run_cmd(self, input_fpath: str) -> str:
+        cmd = f"python3 {self.executable_path} --config {input_fpath}.yaml"
+        if self.run_cache_dir:
+            cmd = (
+                f"python3 {runcache.__file__} exec "
+                f"--cache-dir {self.run_cache_dir} "
+                f"--max-size-mib {self.run_cache_size} "
+                f"--config {input_fpath}.yaml "
+                f"--source {self.executable_path} -- {cmd}"
+            )
+
+        return cmd
+
     def post_run_cmds(
         self, host: str, run_output_root: pathlib.Path
     ) -> list[types.ShellCmdSpec]:
-        return []
+        cmds = []
+        if self.profile_runs:
+            cmds.append(
+                types.ShellCmdSpec(
+                    cmd=f"python3 {runprof.__file__} finish --output-root {run_output_root};",
+                    shell=True,
+                    wait=True,
+                )
+            )
+
+        # With async, the launcher collates once all runs are done instead.
+        if self.exec_collate and self.exec_mode != "async":
+            # After runprof, which exits with the run's status
+            cmds.append(
+                types.ShellCmdSpec(
+                    cmd=(
+                        f"python3 {pipelined.__file__} run-done --status $? "
+                        f"--run-output-root {run_output_root} "
+                        f"--n-runs {self.n_runs} {self.collate_args};"
+                    ),
+                    shell=True,
+                    wait=True,
+                )
+            )
+
+        return cmds
 
 
 @implements.implements(bindings.IExpConfigurer)
@@ -98,7 +225,20 @@ class ExpConfigurer:
         pass
 
     def parallelism_paradigm(self) -> str:
-        return "per-batch"
+        # Resolved from --exec-paradigm by cmdline_postparse_configure()
+        return self.cmdopts["exec_paradigm"]
+
+
+def expdef_flatten(exp_def: definition.BaseExpDef) -> definition.BaseExpDef:
+    """
+    Switch stage 1 over to the cached experiment definitions from
+    :mod:`plugins.expdefcache` before SIERRA scaffolds the batch.
+
+    YAMLSIM doesn't support nested config files, so there is nothing to
+    actually flatten.
+    """
+    return expdefcache.adopt(exp_def)
+
 
 def cmdline_postparse_configure(
     execenv: str, args: argparse.Namespace
@@ -121,24 +261,155 @@ def cmdline_postparse_configure(
     if not any(stage in args.pipeline for stage in [1, 2]):
         return args
 
+    if args.exec_mode == "async" and args.profile_runs:
+        raise ValueError("--profile-runs can't be used with --exec-mode=async")
+
     if execenv == "hpc.local":
-        return _configure_hpc_local(args)
+        args = _configure_hpc_local(args)
     elif execenv == "prefectserver.local":
-        return _configure_prefectserver_local(args)
-    elif execenv == "prefectserver.dockerremote":
-        return args
+        args = _configure_prefectserver_local(args)
+    elif execenv != "prefectserver.dockerremote":
+        _logger.warning(f"'{execenv}' unsupported on YAMLSIM--may crash unexpectedly!")
 
-    _logger.warning(f"'{execenv}' unsupported on YAMLSIM--may crash unexpectedly!")
+    args.exec_paradigm = _select_paradigm(args)
     return args
 
 
+def execenv_check(cmdopts: types.Cmdopts) -> None:
+    """
+    Check that stage 3 can read what stage 2 leaves behind.
+
+    Only plugins in :data:`plugins.collate.compacted.kREADERS` read raw outputs
+    compacted by ``--exec-collate-retain=compact``; the rest find nothing.
+    """
+    if not cmdopts["exec_collate"] or cmdopts["exec_collate_retain"] != "compact":
+        return
+
+    unread = [p for p in cmdopts["proc"] if p not in compacted.kREADERS]
+    if unread:
+        _logger.warning(
+            "--proc %s can't read raw outputs compacted by "
+            "--exec-collate-retain=compact; use %s in stage 3",
+            " ".join(unread),
+            " ".join(compacted.kREADERS),
+        )
+
+
+def _select_paradigm(args: argparse.Namespace) -> str:
+    """
+    Resolve ``--exec-paradigm`` to the parallelism paradigm for the batch.
+
+    Same as for JSONSIM: for ``auto``, ``per-exp`` is picked if, per the
+    estimated run time, it is at most ``_kPER_EXP_MAX_OVERHEAD`` slower than
+    ``per-batch``.
+    """
+    if args.exec_mode == "async":
+        # The async launcher for each experiment does its own parallelism
+        if args.exec_paradigm == "per-batch":
+            raise ValueError(
+                "--exec-paradigm=per-batch can't be used with --exec-mode=async"
+            )
+
+        if args.exec_paradigm == "auto":
+            _logger.info("Selected per-exp parallelism: required by --exec-mode=async")
+
+        return "per-exp"
+
+    if args.exec_paradigm is None:
+        return "per-batch"
+    elif args.exec_paradigm != "auto":
+        return args.exec_paradigm
+
+    n_slots = args.exec_jobs_per_node or min(args.n_runs, _max_parallel_runs(args))
+
+    per_batch = args.n_runs / n_slots * _kRUN_TIME
+    per_exp = math.ceil(args.n_runs / n_slots) * _kRUN_TIME + _kEXP_LAUNCH_TIME
+    overhead = per_exp / per_batch - 1
+    paradigm = "per-exp" if overhead <= _kPER_EXP_MAX_OVERHEAD else "per-batch"
+
+    _logger.info(
+        "Selected %s parallelism: est. %.2fs/run, %s runs/exp on %s slots; "
+        "per-exp est. %.0f%% slower than per-batch (max %.0f%%)",
+        paradigm,
+        _kRUN_TIME,
+        args.n_runs,
+        n_slots,
+        overhead * 100,
+        _kPER_EXP_MAX_OVERHEAD * 100,
+    )
+    _logger.info("Runs are mostly interpreter startup: --exec-mode=async may be faster")
+
+    return paradigm
+
+
+def _estimate_run_mem(args: argparse.Namespace) -> int:
+    """
+    Estimate the peak memory in bytes of a single YAMLSIM run from the
+    ``confusion_matrix`` and ``graphs`` sizes in ``--expdef-template``.
+    """
+    with open(args.expdef_template, "r") as f:
+        config = yaml.safe_load(f)["config"]
+
+    n_classes = int(config["confusion_matrix"]["n_classes"])
+    confusion_rows = (
+        n_classes * (n_classes - 1) * _kCONFUSION_OFFDIAG_COUNT
+        + n_classes * _kCONFUSION_DIAG_COUNT
+    )
+
+    graphs = config["graphs"]
+    n_graphs = int(graphs["n_graphs"])
+    max_nodes = int(graphs["start_nodes"]) + (n_graphs - 1) * int(graphs["node_step"])
+    max_edges = float(graphs["edge_probability"]) * max_nodes * (max_nodes - 1) / 2
+    n_workers = int(graphs["n_workers"]) or os.cpu_count() or 1
+
+    return int(
+        _kRUN_MEM_BASE
+        + confusion_rows * _kRUN_MEM_PER_CONFUSION_ROW
+        + min(n_workers, max(n_graphs, 0))
+        * max_edges
+        * _kRUN_MEM_PER_EDGE.get(graphs["format"], _kRUN_MEM_PER_EDGE["graphml"])
+    )
+
+
+def _max_parallel_runs(args: argparse.Namespace) -> int:
+    """
+    Get the max # of runs which can execute in parallel on this node.
+
+    Each run needs a core and enough memory for its estimated peak usage;
+    whichever runs out first sets the limit.
+    """
+    # Only needed when generating commands, so not imported at module level.
+    import psutil
+
+    n_cores = int(psutil.cpu_count())
+    run_mem = _estimate_run_mem(args)
+    avail_mem = psutil.virtual_memory().available
+    n_mem = max(1, avail_mem // run_mem)
+
+    _logger.info(
+        "Estimated %.1f MiB/run with %.1f MiB available: memory allows %s "
+        "parallel runs, cores allow %s",
+        run_mem / 1024**2,
+        avail_mem / 1024**2,
+        n_mem,
+        n_cores,
+    )
+    if run_mem > avail_mem:
+        _logger.warning(
+            "A single run may not fit in available memory (see confusion_matrix "
+            "and graphs in --expdef-template)"
+        )
+
+    return min(n_cores, n_mem)
+
+
 def _configure_prefectserver_local(args: argparse.Namespace) -> argparse.Namespace:
     _logger.debug("Configuring for Prefect local execution")
 
     if args.exec_jobs_per_node is None:
-        parallel_jobs = int(psutil.cpu_count())
+        parallel_jobs = _max_parallel_runs(args)
 
-        # Make sure we don't oversubscribe cores
+        # Make sure we don't oversubscribe cores or memory
         args.exec_jobs_per_node = min(args.n_runs, parallel_jobs)
 
     _logger.debug("Allocated %s parallel runs/node", args.exec_jobs_per_node)
@@ -150,10 +421,10 @@ def _configure_hpc_local(args: argparse.Namespace) -> argparse.Namespace:
     _logger.debug("Configuring for HPC local execution")
 
     if args.exec_jobs_per_node is None:
-        parallel_jobs = int(psutil.cpu_count())
+        parallel_jobs = _max_parallel_runs(args)
 
-        # Make sure we don't oversubscribe cores--each simulation needs at
-        # least 1 core.
+        # Make sure we don't oversubscribe cores or memory--each simulation
+        # needs at least 1 core and its estimated peak memory.
         args.exec_jobs_per_node = min(args.n_runs, parallel_jobs)
 
     _logger.debug("Allocated %s parallel runs/node", args.exec_jobs_per_node)
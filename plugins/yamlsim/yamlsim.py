@@ -6,16 +6,25 @@
 
 # Core packages
 import argparse
+import concurrent.futures as cf
+import json
+import os
 import yaml
 import pathlib
 
 # 3rd party packages
 import pandas as pd
 import numpy as np
-import networkx as nx
 
 # Project packages
 
+# File extension for each supported tabular output format.
+_kOUTPUT_EXTS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Suffix of the summary stats sidecar written next to each tabular output, with
+# --output-summary; output1D.csv -> output1D.summary.json.
+_kSUMMARY_SUFFIX = ".summary.json"
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -27,70 +36,251 @@ def main():
 
     config = yaml.safe_load(open(args.config, "r"))
 
-    # Generate seeded random 1D data
-    rng = np.random.RandomState(42)
+    # Independent random streams for each output, derived from the per-run
+    # seed, so that none depends on how much of the others is drawn.
+    ss1D, ss_confusion, ss_graphs = np.random.SeedSequence(
+        int(config["random_seed"])
+    ).spawn(3)
+
+    # Generate random 1D data
+    rng = np.random.default_rng(ss1D)
     data_1D = rng.normal(loc=0, scale=0.5, size=(50, 5))
     df1D = pd.DataFrame(data_1D, columns=[f"col{i}" for i in range(0, 5)])
 
     root = pathlib.Path(config["output_root"])
     root.mkdir(parents=True, exist_ok=True)
-    df1D.to_csv(root / "output1D.csv", index=False)
+    fmt = config["output_format"]
+    ext = _kOUTPUT_EXTS[fmt]
+    write_df(df1D, root / f"output1D{ext}", fmt)
+    write_summary(df1D, root / f"output1D{ext}", config["output_summary"])
 
     # Generate confusion matrix
-    classes = ['Class_0', 'Class_1', 'Class_2', 'Class_3', 'Class_4', 
-               'Class_5', 'Class_6', 'Class_7', 'Class_8', 'Class_9']
-
-    confusion_data = []
-    for actual_class in classes:
-        for predicted_class in classes:
-            # Generate higher counts for correct predictions (diagonal)
-            if actual_class == predicted_class:
-                count = np.random.randint(70, 95)
-            else:
-                count = np.random.randint(1, 10)
-
-            # Add rows for each occurrence
-            for _ in range(count):
-                confusion_data.append({
-                    'Actual_Class': actual_class,
-                    'Predicted_Class': predicted_class
-                })
-
-    confusion_df = pd.DataFrame(confusion_data)
-    confusion_df['Index'] = range(len(confusion_df))
-    confusion_df = confusion_df.set_index("Index")
-    confusion_df.to_csv(root / "confusion-matrix.csv")
+    confusion_df = gen_confusion_matrix(
+        np.random.default_rng(ss_confusion),
+        int(config["confusion_matrix"]["n_classes"]),
+    )
+    write_df(confusion_df, root / f"confusion-matrix{ext}", fmt)
+    write_summary(
+        confusion_df, root / f"confusion-matrix{ext}", config["output_summary"]
+    )
 
     # Generate graphs
-    graph_dir = root / 'erdos_renyi'
+    graph_dir = root / "erdos_renyi"
     graph_dir.mkdir(exist_ok=True)
 
-    start_nodes = 5  # Starting number of nodes
-    num_graphs = 10  # Number of graphs to generate
-    edge_probability = 0.3  # Probability of edge creation in random graph
+    graphs = config["graphs"]
+    n_graphs = int(graphs["n_graphs"])
+
+    # Each graph gets its own stream, so the graphs don't depend on how many
+    # workers generate them or in what order.
+    seeds = ss_graphs.spawn(n_graphs)
+    jobs = [
+        (
+            i,
+            int(graphs["start_nodes"]) + i * int(graphs["node_step"]),
+            float(graphs["edge_probability"]),
+            seeds[i],
+            graph_dir,
+            graphs["format"],
+        )
+        for i in range(n_graphs)
+    ]
+
+    n_workers = int(graphs["n_workers"]) or os.cpu_count()
+    if n_workers == 1:
+        for job in jobs:
+            write_graph(*job)
+    else:
+        with cf.ProcessPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(write_graph, *zip(*jobs)))
+
+
+def gen_graph(
+    n_nodes: int, edge_probability: float, seed: np.random.SeedSequence
+) -> np.ndarray:
+    """
+    Generate the edges of a random (Erdős-Rényi) graph as an (n_edges, 2) array.
+
+    Each node's candidate edges to higher numbered nodes are drawn one row at a
+    time, so memory usage is proportional to the # of edges rather than
+    ``n_nodes`` squared.
+    """
+    rng = np.random.default_rng(seed)
+
+    rows = []
+    for u in range(0, n_nodes - 1):
+        v = np.flatnonzero(rng.random(n_nodes - u - 1) < edge_probability)
+        rows.append(np.column_stack((np.full(len(v), u), v + u + 1)))
+
+    if not rows:
+        return np.empty((0, 2), dtype=np.int64)
+
+    return np.concatenate(rows)
+
+
+def write_graph(
+    graph_id: int,
+    n_nodes: int,
+    edge_probability: float,
+    seed: np.random.SeedSequence,
+    graph_dir: pathlib.Path,
+    fmt: str,
+) -> None:
+    """
+    Generate a random graph and write it to ``graph_dir`` in the given format.
+
+    - ``graphml`` - GraphML, with graph metadata and per-node degrees as
+      attributes. What ``imagize`` reads.
+
+    - ``edgelist`` - One ``<u> <v>`` line per edge.
+
+    - ``npz`` - Compressed numpy archive with ``edges``, ``degree`` and the
+      graph metadata. By far the smallest and fastest for large graphs.
+    """
+    edges = gen_graph(n_nodes, edge_probability, seed)
+    degree = np.bincount(edges.ravel(), minlength=n_nodes)
+    stem = graph_dir / f"erdos_renyi_{graph_id:03d}"
+
+    if fmt == "graphml":
+        _write_graphml(pathlib.Path(f"{stem}.graphml"), edges, degree, graph_id)
+    elif fmt == "edgelist":
+        np.savetxt(f"{stem}.edgelist", edges, fmt="%d")
+    elif fmt == "npz":
+        np.savez_compressed(
+            f"{stem}.npz",
+            edges=edges.astype(np.int32),
+            degree=degree.astype(np.int32),
+            num_nodes=n_nodes,
+            num_edges=len(edges),
+            graph_id=graph_id,
+        )
+    else:
+        raise ValueError(f"Unknown graph format '{fmt}'")
+
+
+def _write_graphml(
+    path: pathlib.Path, edges: np.ndarray, degree: np.ndarray, graph_id: int
+) -> None:
+    # Produces the same document as building an nx.Graph with the same
+    # attributes and calling nx.write_graphml() on it; building the graph and
+    # the generic writer are both far slower for large graphs.
+    ns = "http://graphml.graphdrawing.org/xmlns"
+    parts = [
+        "<?xml version='1.0' encoding='utf-8'?>\n",
+        f'<graphml xmlns="{ns}" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        f'xsi:schemaLocation="{ns} {ns}/1.0/graphml.xsd">\n',
+        '  <key id="d3" for="node" attr.name="degree" attr.type="long" />\n',
+        '  <key id="d2" for="graph" attr.name="graph_id" attr.type="long" />\n',
+        '  <key id="d1" for="graph" attr.name="num_edges" attr.type="long" />\n',
+        '  <key id="d0" for="graph" attr.name="num_nodes" attr.type="long" />\n',
+        '  <graph edgedefault="undirected">\n',
+    ]
+    parts.extend(
+        f'    <node id="{u}">\n      <data key="d3">{d}</data>\n    </node>\n'
+        for u, d in enumerate(degree.tolist())
+    )
+    parts.extend(
+        f'    <edge source="{u}" target="{v}" />\n' for u, v in edges.tolist()
+    )
+    parts.extend(
+        [
+            f'    <data key="d0">{len(degree)}</data>\n',
+            f'    <data key="d1">{len(edges)}</data>\n',
+            f'    <data key="d2">{graph_id}</data>\n',
+            "  </graph>\n",
+            "</graphml>\n",
+        ]
+    )
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+
+
+def gen_confusion_matrix(rng: np.random.Generator, n_classes: int) -> pd.DataFrame:
+    """
+    Generate random (actual, predicted) class pairs for a confusion matrix.
+
+    The count for each (actual, predicted) cell is drawn all at once, with
+    higher counts for correct predictions (the diagonal), and then each pair
+    is repeated that many times, in actual-major order.
+    """
+    classes = [f"Class_{i}" for i in range(0, n_classes)]
+
+    counts = rng.integers(1, 10, size=(n_classes, n_classes))
+    np.fill_diagonal(counts, rng.integers(70, 95, size=n_classes))
+    counts = counts.ravel()
+
+    # Expand class indices rather than names, and only map them to names as a
+    # categorical, so no per-row strings are ever created.
+    codes = np.arange(n_classes)
+    actual = np.repeat(np.repeat(codes, n_classes), counts)
+    predicted = np.repeat(np.tile(codes, n_classes), counts)
+
+    return pd.DataFrame(
+        {
+            "Index": np.arange(len(actual)),
+            "Actual_Class": pd.Categorical.from_codes(actual, classes),
+            "Predicted_Class": pd.Categorical.from_codes(predicted, classes),
+        }
+    )
+
+
+def summarize(df: pd.DataFrame) -> dict:
+    """
+    Compute per-column summary stats of a frame.
+
+    For each numeric column: the first and last values (what inter-experiment
+    summary line graphs and heatmaps use, via their ``index``), min, max, mean
+    and (sample) standard deviation.
+    """
+    cols = {}  # type: dict[str, dict[str, object]]
+    if len(df) > 0:
+        for col in df.select_dtypes("number").columns:
+            x = df[col].to_numpy()
+            cols[col] = {
+                "first": x[0].item(),
+                "last": x[-1].item(),
+                "min": x.min().item(),
+                "max": x.max().item(),
+                "mean": float(x.mean()),
+                "std": float(x.std(ddof=1)) if len(x) > 1 else None,
+            }
+
+    return {"n_rows": len(df), "cols": cols}
+
+
+def write_summary(df: pd.DataFrame, path: pathlib.Path, enabled: bool) -> None:
+    """
+    Write the summary sidecar for the output at ``path``.
 
-    for i in range(num_graphs):
-        num_nodes = start_nodes + i
+    If not ``enabled``, a stale sidecar from a previous run into the same output
+    directory is removed instead, so it never describes different data.
+    """
+    sidecar = path.with_suffix(_kSUMMARY_SUFFIX)
+    if not enabled:
+        sidecar.unlink(missing_ok=True)
+        return
 
-        # Generate a random graph (Erdős-Rényi model)
-        #
-        # Other generator options:
-        # G = nx.barabasi_albert_graph(num_nodes, 2)  # Scale-free network
-        # G = nx.watts_strogatz_graph(num_nodes, 4, 0.3)  # Small-world network
-        G = nx.erdos_renyi_graph(num_nodes, edge_probability)
+    with open(sidecar, "w") as f:
+        json.dump(summarize(df), f)
 
-        # Add some metadata to the graph
-        G.graph['num_nodes'] = num_nodes
-        G.graph['num_edges'] = G.number_of_edges()
-        G.graph['graph_id'] = i
 
-        # Add node attributes (optional)
-        for node in G.nodes():
-            G.nodes[node]['degree'] = G.degree(node)
+def write_df(df: pd.DataFrame, path: pathlib.Path, fmt: str) -> None:
+    """
+    Write a frame to ``path`` in the given output format.
 
-        # Write to GraphML file with numeric name
-        filename = f'{graph_dir}/erdos_renyi_{i:03d}.graphml'
-        nx.write_graphml(G, filename)
+    ``parquet`` and ``arrow`` (Arrow IPC) outputs are zstd compressed; both need
+    ``pyarrow``.
+    """
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    elif fmt == "arrow":
+        df.to_feather(path, compression="zstd")
+    else:
+        raise ValueError(f"Unknown output format '{fmt}'")
 
 
 if __name__ == "__main__":
@@ -16,22 +16,27 @@ import numpy as np
 from sierra.core.models.interface import IIntraExpModel1D, IInterExpModel1D
 from sierra.core.variables import batch_criteria as bc
 from sierra.core import types, exproot, batchroot
+from plugins import batchmodel, modelcache
 
 
 @implements.implements(IIntraExpModel1D)
-class NoisyModel:
+class NoisyModel(batchmodel.BatchIntraExpModel1D):
     def __init__(self, params: types.YAMLDict) -> None:
-        pass
+        batchmodel.BatchIntraExpModel1D.__init__(self, params)
 
-    def run(
+    def run_batch(
         self,
         criteria: bc.XVarBatchCriteria,
-        exp_num: int,
+        exp_nums: list[int],
         cmdopts: types.Cmdopts,
-        pathset: exproot.PathSet,
-    ) -> list[pl.DataFrame]:
-        data = np.random.normal(loc=0, scale=1, size=(50, 1)) * 80
-        return [pl.DataFrame(data, schema=["model"])]
+        pathsets: tp.Sequence[exproot.PathSet],
+    ) -> list[list[pl.DataFrame]]:
+        # Draw for all experiments at once, and hand back (zero-copy) slices of
+        # a single frame, rather than building one per experiment.
+        data = np.random.normal(loc=0, scale=1, size=50 * len(exp_nums)) * 80
+        df = pl.DataFrame({"model": data})
+
+        return [[df.slice(i * 50, 50)] for i in range(0, len(exp_nums))]
 
     def should_run(
         self, criteria: bc.XVarBatchCriteria, cmdopts: types.Cmdopts, exp_num: int
@@ -43,11 +48,11 @@ class NoisyModel:
 
 
 @implements.implements(IInterExpModel1D)
-class LessNoisyModel:
+class LessNoisyModel(modelcache.CachedInterExpModel1D):
     def __init__(self, params: types.YAMLDict) -> None:
-        pass
+        modelcache.CachedInterExpModel1D.__init__(self, params)
 
-    def run(
+    def run_uncached(
         self,
         criteria: bc.XVarBatchCriteria,
         cmdopts: types.Cmdopts,
@@ -14,6 +14,7 @@ from sierra.core.experiment import definition, spec
 from sierra.core import types
 
 from plugins.yamlsim.generators import engine
+from plugins import expgen
 
 
 def to_dict(scenario: str) -> tp.Dict[str, tp.Any]:
@@ -43,10 +44,11 @@ def for_all_fizzbuzz(spec: spec.ExperimentSpec,
                    controller: str,
                    cmdopts: types.Cmdopts,
                    expdef_template_fpath: pathlib.Path) -> definition.BaseExpDef:
-    exp_def = engine.for_all_exp(spec,
-                                   controller,
-                                   cmdopts,
-                                   expdef_template_fpath)
+    exp_def = expgen.for_all_exp(engine.for_all_exp,
+                                 spec,
+                                 controller,
+                                 cmdopts,
+                                 expdef_template_fpath)
 
     return exp_def
 